@@ -1,17 +1,46 @@
 
 import keyring
 import logging
-from typing import List, Optional, Dict
-from ..database.db_manager import DBManager
+import threading
+import time
+from collections import namedtuple
+from typing import List, Optional, Dict, Tuple
+from ..database.db_manager import DBManager, SQL_GET_ACCOUNT_ID, SQL_GET_ACTIVE_ACCOUNTS
+from .event_bus import EventBus, Events
 
 logger = logging.getLogger(__name__)
 
+# Lightweight, immutable account record returned by get_accounts()
+Account = namedtuple('Account', 'id email imap_host imap_port smtp_host smtp_port')
+
 class AccountManager:
     SERVICE_NAME = "AccessibleEmailClient"
 
+    # Shared by all instances: accounts change rarely but are read on every poll/connect
+    _accounts_cache: Optional[List[Account]] = None
+    _cache_lock = threading.Lock()
+
+    # Keyring lookups are an IPC/DBus round-trip; keep passwords briefly in memory
+    _PW_TTL = 300
+    _pw_cache: Dict[str, Tuple[str, float]] = {}  # {email: (password, expires_at)}
+
     def __init__(self):
         self.db = DBManager()
 
+    @classmethod
+    def invalidate_cache(cls, *_):
+        with cls._cache_lock:
+            cls._accounts_cache = None
+
+    @classmethod
+    def invalidate_password(cls, email: str):
+        """
+        Drop the account's cached password, e.g. after the server rejected it,
+        so the next get_password reads the keyring again.
+        """
+        with cls._cache_lock:
+            cls._pw_cache.pop(email, None)
+
     def add_account(self, email: str, password: str, 
                     imap_host: str, imap_port: int, 
                     smtp_host: str, smtp_port: int) -> bool:
@@ -20,13 +49,14 @@ class AccountManager:
         """
         try:
             # Check if account already exists
-            existing = self.db.fetch_one("SELECT id FROM accounts WHERE email = ?", (email,))
+            existing = self.db.fetch_one(SQL_GET_ACCOUNT_ID, (email,))
             if existing:
-                logger.warning(f"Account {email} already exists.")
+                logger.warning("Account %s already exists.", email)
                 return False
 
             # Store password in keyring
             keyring.set_password(self.SERVICE_NAME, email, password)
+            self.invalidate_password(email)
 
             # Store account details in DB
             query = """
@@ -35,12 +65,13 @@ class AccountManager:
                 VALUES (?, ?, ?, ?, ?)
             """
             self.db.execute_commit(query, (email, imap_host, imap_port, smtp_host, smtp_port))
+            self.invalidate_cache()
             
-            logger.info(f"Account {email} added successfully.")
+            logger.info("Account %s added successfully.", email)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to add account {email}: {e}")
+            logger.error("Failed to add account %s: %s", email, e)
             return False
 
     def update_account(self, old_email: str, new_email: str, password: str, 
@@ -52,9 +83,9 @@ class AccountManager:
         try:
             # If email changing, check if new email exists
             if old_email != new_email:
-                existing = self.db.fetch_one("SELECT id FROM accounts WHERE email = ?", (new_email,))
+                existing = self.db.fetch_one(SQL_GET_ACCOUNT_ID, (new_email,))
                 if existing:
-                    logger.warning(f"Cannot update: Account {new_email} already exists.")
+                    logger.warning("Cannot update: Account %s already exists.", new_email)
                     return False
             
             # Update DB
@@ -65,6 +96,7 @@ class AccountManager:
                 WHERE email = ?
             """
             self.db.execute_commit(query, (new_email, imap_host, imap_port, smtp_host, smtp_port, old_email))
+            self.invalidate_cache()
             
             # If email changed, update Keyring
             if old_email != new_email:
@@ -78,42 +110,58 @@ class AccountManager:
                 if password:
                      keyring.set_password(self.SERVICE_NAME, new_email, password)
             
-            logger.info(f"Account {old_email} updated successfully (became {new_email}).")
+            self.invalidate_password(old_email)
+            self.invalidate_password(new_email)
+            self._drop_sessions(old_email)
+            logger.info("Account %s updated successfully (became %s).", old_email, new_email)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to update account {old_email}: {e}")
+            logger.error("Failed to update account %s: %s", old_email, e)
             return False
 
-    def get_accounts(self) -> List[Dict]:
+    def get_accounts(self) -> List[Account]:
         """
-        Retrieve all active accounts.
+        Retrieve all active accounts. Served from cache until an account changes.
         """
+        with self._cache_lock:
+            if self._accounts_cache is not None:
+                return list(self._accounts_cache)
         try:
-            rows = self.db.fetch_all("SELECT id, email, provider_imap_host, provider_imap_port, provider_smtp_host, provider_smtp_port FROM accounts WHERE is_active = 1")
-            accounts = []
-            for row in rows:
-                accounts.append({
-                    "id": row['id'],
-                    "email": row['email'],
-                    "imap_host": row['provider_imap_host'],
-                    "imap_port": row['provider_imap_port'],
-                    "smtp_host": row['provider_smtp_host'],
-                    "smtp_port": row['provider_smtp_port']
-                })
-            return accounts
+            rows = self.db.fetch_all(SQL_GET_ACTIVE_ACCOUNTS)
+            accounts = [
+                Account(row['id'], row['email'],
+                        row['provider_imap_host'], row['provider_imap_port'],
+                        row['provider_smtp_host'], row['provider_smtp_port'])
+                for row in rows
+            ]
+            with self._cache_lock:
+                AccountManager._accounts_cache = accounts
+            return list(accounts)
         except Exception as e:
-            logger.error(f"Failed to retrieve accounts: {e}")
+            logger.error("Failed to retrieve accounts: %s", e)
             return []
 
     def get_password(self, email: str) -> Optional[str]:
         """
-        Retrieve password from keyring.
+        Retrieve password from keyring. Cached in memory for _PW_TTL seconds.
         """
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._pw_cache.get(email)
+            if cached:
+                if cached[1] > now:
+                    return cached[0]
+                # Expired: drop the reference rather than keep it around
+                del self._pw_cache[email]
         try:
-            return keyring.get_password(self.SERVICE_NAME, email)
+            password = keyring.get_password(self.SERVICE_NAME, email)
+            if password:
+                with self._cache_lock:
+                    self._pw_cache[email] = (password, now + self._PW_TTL)
+            return password
         except Exception as e:
-            logger.error(f"Failed to retrieve password for {email}: {e}")
+            logger.error("Failed to retrieve password for %s: %s", email, e)
             return None
 
     def delete_account(self, email: str) -> bool:
@@ -123,15 +171,37 @@ class AccountManager:
         try:
             # Remove from DB
             self.db.execute_commit("DELETE FROM accounts WHERE email = ?", (email,))
+            self.invalidate_cache()
+            self.invalidate_password(email)
             
             # Remove from keyring
             try:
                 keyring.delete_password(self.SERVICE_NAME, email)
             except keyring.errors.PasswordDeleteError:
-                logger.warning(f"Password for {email} not found in keyring during deletion.")
+                logger.warning("Password for %s not found in keyring during deletion.", email)
 
-            logger.info(f"Account {email} deleted.")
+            self._drop_sessions(email)
+            logger.info("Account %s deleted.", email)
             return True
         except Exception as e:
-            logger.error(f"Failed to delete account {email}: {e}")
+            logger.error("Failed to delete account %s: %s", email, e)
             return False
+
+    def _drop_sessions(self, email: str):
+        """
+        Close any pooled IMAP/SMTP session so the next use logs in with the new settings.
+        """
+        try:
+            # Imported lazily: imap_pool -> imap_client -> account_manager
+            from .imap_pool import imap_pool
+            imap_pool.discard(email)
+        except Exception as e:
+            logger.warning("Failed to drop IMAP session for %s: %s", email, e)
+        try:
+            from .smtp_client import SMTPClient
+            SMTPClient.discard(email)
+        except Exception as e:
+            logger.warning("Failed to drop SMTP session for %s: %s", email, e)
+
+# Accounts may be added by components holding their own AccountManager
+EventBus.subscribe(Events.ACCOUNT_ADDED, AccountManager.invalidate_cache)
@@ -1,20 +1,34 @@
 
-import json
+import atexit
 import os
 import logging
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional
 from ..utils.appdata import get_appdata_dir
+from ..core import jsonutil
 
 logger = logging.getLogger(__name__)
 
 class Configuration:
+    # Bursts of set() calls within this window are written to disk once
+    FLUSH_DELAY = 0.5
+
     def __init__(self, config_file: str | None = None):
         if config_file is None:
             base_dir = get_appdata_dir()
             config_file = os.path.join(base_dir, "config.json")
         self.config_file = config_file
         self.data: Dict[str, Any] = {}
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        # Serializes the file write and rename, done outside _save_lock
+        self._write_lock = threading.Lock()
+        self._generation = 0  # bumped by every set()
+        self._saved_generation = 0  # generation of the snapshot last written
         self.load()
+        # The flush timer is a daemon thread; write pending changes on exit whichever entry point ran
+        atexit.register(self.flush)
 
     def load(self):
         if not os.path.exists(self.config_file):
@@ -23,27 +37,80 @@ class Configuration:
             return
 
         try:
-            with open(self.config_file, 'r') as f:
-                self.data = json.load(f)
+            with open(self.config_file, 'rb') as f:
+                self.data = jsonutil.loads(f.read())
             logger.info("Configuration loaded.")
         except Exception as e:
             logger.error(f"Failed to load configuration: {e}")
             self.data = {}
 
     def save(self):
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.data, f, indent=4)
-            logger.info("Configuration saved.")
-        except Exception as e:
-            logger.error(f"Failed to save configuration: {e}")
+        """
+        Write the configuration to disk now. Writes to a temp file and swaps it in,
+        so a crash mid-write never leaves a truncated config behind.
+        """
+        with self._save_lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            generation = self._generation
+            # Serialize while set() is locked out, nested dicts included; only the
+            # file I/O below runs without the lock
+            try:
+                payload = jsonutil.dumps(self.data, pretty=True)
+            except Exception as e:
+                logger.error(f"Failed to save configuration: {e}")
+                return
+
+        with self._write_lock:
+            if generation < self._saved_generation:
+                # A newer snapshot is already on disk
+                return
+            tmp_file = f"{self.config_file}.tmp"
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_file, self.config_file)
+            except Exception as e:
+                logger.error(f"Failed to save configuration: {e}")
+                return
+            self._saved_generation = generation
+        logger.info("Configuration saved.")
+
+        with self._save_lock:
+            # Only a successful swap counts as saved, and only if nothing changed
+            # since the snapshot; otherwise stay dirty for flush()
+            if self._generation == generation:
+                self._dirty = False
+
+    def flush(self):
+        """
+        Write pending changes immediately (e.g. on application exit).
+        """
+        if self._dirty:
+            self.save()
+
+    def _schedule_flush(self):
+        """
+        Mark the config dirty and arm the flush timer. Caller must hold _save_lock.
+        """
+        self._dirty = True
+        self._generation += 1
+        if self._flush_timer:
+            # A write is already pending and will pick this change up; don't
+            # start a new timer thread for every set() in a burst
+            return
+        self._flush_timer = threading.Timer(self.FLUSH_DELAY, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
 
     def get(self, key: str, default: Any = None) -> Any:
         return self.data.get(key, default)
 
     def set(self, key: str, value: Any):
-        self.data[key] = value
-        self.save()
+        with self._save_lock:
+            self.data[key] = value
+            self._schedule_flush()
 
     def get_bool(self, key: str, default: bool = False) -> bool:
         val = self.data.get(key, default)
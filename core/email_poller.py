@@ -2,9 +2,13 @@
 import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
 from ..core.account_manager import AccountManager
-from ..core.imap_client import IMAPClient
+from ..core.imap_client import _decode_fast, _CONNECTION_ERRORS
+from ..core.imap_pool import imap_pool
 from ..core.notification_manager import notification_manager
+from ..database.db_manager import db_manager
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +19,9 @@ class EmailPoller(threading.Thread):
         self.running = False
         self.account_manager = AccountManager()
         self.last_uids = {} # {email: last_seen_uid}
+        self._uids_lock = threading.Lock() # Guards last_uids across per-account workers
+        # {(account_id, folder_name): folder_id}; folder rows are never renumbered within a session
+        self._folder_ids: Dict[Tuple[int, str], int] = {}
         self.daemon = True # Daemon thread exits when main program exits
 
     def run(self):
@@ -34,41 +41,87 @@ class EmailPoller(threading.Thread):
     def stop(self):
         self.running = False
 
-    def _sync_initial_uids(self):
+    def _for_each_account(self, worker):
+        """
+        Run worker(acc) for every account concurrently.
+        Each account talks to its own server socket, so the waits overlap.
+        """
         accounts = self.account_manager.get_accounts()
-        for acc in accounts:
-            email_addr = acc['email']
-            try:
-                client = IMAPClient(email_addr)
+        if not accounts:
+            return
+        with ThreadPoolExecutor(max_workers=len(accounts)) as executor:
+            # Consume results so worker exceptions are not silently dropped
+            for future in [executor.submit(worker, acc) for acc in accounts]:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Poller worker failed: {e}")
+
+    def _sync_initial_uids(self):
+        self._for_each_account(self._sync_initial_uid)
+
+    def _sync_initial_uid(self, acc):
+        email_addr = acc.email
+        client = None
+        try:
+            client = imap_pool.get(email_addr)
+            if not client.client:
+                return
+
+            # Get all UIDs
+            # We need to access the underlying client to get max UID efficiently
+            # or use search(['ALL'])
+            with client._lock:
                 # Select Inbox
                 client.select_folder('INBOX', readonly=True)
-                
-                # Get all UIDs
-                # We need to access the underlying client to get max UID efficiently
-                # or use search(['ALL'])
-                if client.client:
-                    # imapclient search returns list of UIDs
-                    uids = client.client.search(['ALL'])
-                    if uids:
-                        self.last_uids[email_addr] = max(uids)
-                    else:
-                        self.last_uids[email_addr] = 0
-                client.logout()
-            except Exception as e:
-                logger.error(f"Failed to sync initial UID for {email_addr}: {e}")
+                # imapclient search returns list of UIDs
+                uids = client.client.search(['ALL'])
+            with self._uids_lock:
+                self.last_uids[email_addr] = max(uids) if uids else 0
+        except Exception as e:
+            logger.error(f"Failed to sync initial UID for {email_addr}: {e}")
+            self._discard_if_disconnected(client, email_addr, e)
 
     def _poll_accounts(self):
-        accounts = self.account_manager.get_accounts()
-        for acc in accounts:
-            email_addr = acc['email']
+        self._for_each_account(self._poll_single_account)
+
+    def _has_new_uids(self, client, email_addr, last_uid):
+        """
+        Cheap STATUS (UIDNEXT) check: every existing UID is below UIDNEXT, so if
+        UIDNEXT <= last_uid + 1 nothing new arrived and SEARCH/FETCH can be skipped.
+        STATUS on the selected mailbox is discouraged (RFC 3501 6.3.10), so when INBOX
+        is already selected on this session fall through to the UID SEARCH instead.
+        Caller must hold client._lock.
+        """
+        if client._selected_folder == 'INBOX':
+            return True
+        try:
+            status = client.client.folder_status('INBOX', ['UIDNEXT'])
+            uid_next = status.get(b'UIDNEXT')
+        except Exception as e:
+            logger.debug(f"UIDNEXT check failed for {email_addr}, searching instead: {e}")
+            return True
+        if uid_next is None:
+            return True
+        return uid_next > last_uid + 1
+
+    def _poll_single_account(self, acc):
+        email_addr = acc.email
+        with self._uids_lock:
             last_uid = self.last_uids.get(email_addr, 0)
-            
-            try:
-                client = IMAPClient(email_addr)
+        
+        client = None
+        try:
+            client = imap_pool.get(email_addr)
+            if not client.client:
+                return
+
+            # The pooled session is shared with the UI, so hold its lock for the IMAP round-trips
+            with client._lock:
+                if last_uid and not self._has_new_uids(client, email_addr, last_uid):
+                    return
+
                 client.select_folder('INBOX', readonly=True)
-                
-                if not client.client:
-                    continue
 
                 # Search for new UIDs
                 # UID criteria: UID > last_uid
@@ -83,65 +136,87 @@ class EmailPoller(threading.Thread):
                 
                 # Filter out those <= last_uid just in case (server logic)
                 real_new_uids = [u for u in new_uids if u > last_uid]
+                if not real_new_uids:
+                    return
+
+                # Fetch details for notification
+                # We might limit to top 3 to avoid spamming
+                latest_uids = sorted(real_new_uids)[-3:]
                 
-                if real_new_uids:
-                    logger.info(f"Found {len(real_new_uids)} new emails for {email_addr}")
-                    self.last_uids[email_addr] = max(real_new_uids)
-                    
-                    # Fetch details for notification
-                    # We might limit to top 3 to avoid spamming
-                    latest_uids = sorted(real_new_uids)[-3:]
-                    
-                    # We need fetch_emails equivalent but for specific UIDs
-                    # imap_client doesn't have fetch_by_uids exposed nicely returning a list of dicts
-                    # We can use fetch_emails logic or just raw client fetch
-                    
-                    response = client.client.fetch(latest_uids, ['ENVELOPE', 'FLAGS'])
-                    for uid, data in response.items():
-                        envelope = data[b'ENVELOPE']
-                        subject = client._decode_str(envelope.subject)
-                        sender = client._format_address(envelope.from_)
-                        date = envelope.date
-                        message_id = client._decode_str(envelope.message_id)
-                        in_reply_to = client._decode_str(envelope.in_reply_to)
-                        flags = [f.decode() if isinstance(f, bytes) else f for f in data.get(b'FLAGS', [])]
-
-                        # Cache to DB
-                        # We need account_id and folder_id (INBOX)
-                        from ..database.db_manager import db_manager
-                        account_id = db_manager.get_account_id(email_addr)
-                        # Ensure INBOX folder exists
-                        folder_id = db_manager.get_folder_id(account_id, "INBOX")
-                        if not folder_id:
-                            folder_id = db_manager.upsert_folder(account_id, "INBOX")
-                            
-                        db_manager.upsert_email(
-                            account_id, folder_id, uid,
-                            subject=subject,
-                            sender=sender,
-                            date=date,
-                            flags=flags,
-                            message_id=message_id,
-                            in_reply_to=in_reply_to,
-                            references=""
-                        )
-
-                        # Trigger Notification
-                        notification_manager.show_toast(
-                            title=f"New Email: {sender}",
-                            message=subject,
-                            on_click=None # Could eventually open the email
-                        )
-                        
-                        # Play Sound
-                        # Extract pure email for sender checking
-                        sender_email = ""
-                        if envelope.from_ and envelope.from_[0].mailbox and envelope.from_[0].host:
-                            sender_email = f"{client._decode_str(envelope.from_[0].mailbox)}@{client._decode_str(envelope.from_[0].host)}"
-                            
-                        notification_manager.play_sound(category='INBOX', sender=sender_email, account_email=email_addr)
-
-                client.logout()
+                # We need fetch_emails equivalent but for specific UIDs
+                # imap_client doesn't have fetch_by_uids exposed nicely returning a list of dicts
+                # We can use fetch_emails logic or just raw client fetch
+                
+                response = client.client.fetch(latest_uids, ['ENVELOPE', 'FLAGS'])
 
-            except Exception as e:
-                logger.error(f"Error polling {email_addr}: {e}")
+            logger.info(f"Found {len(real_new_uids)} new emails for {email_addr}")
+            with self._uids_lock:
+                self.last_uids[email_addr] = max(real_new_uids)
+
+            # Cache to DB
+            # We need account_id and folder_id (INBOX), resolved once per account.
+            # get_accounts() already carries the accounts row id, so no lookup is needed.
+            account_id = acc.id
+            # Ensure INBOX folder exists
+            folder_id = self._folder_ids.get((account_id, "INBOX"))
+            if not folder_id:
+                # upsert_folder answers an existing folder with a plain lookup
+                folder_id = self._folder_ids[(account_id, "INBOX")] = db_manager.upsert_folder(account_id, "INBOX")
+
+            # Parse the batched FETCH response once into DB rows and notification items
+            db_rows = []
+            notif_items = [] # (sender, subject, sender_email)
+            for uid, data in sorted(response.items()):
+                envelope = data[b'ENVELOPE']
+                subject = client._decode_str(envelope.subject)
+                sender = client._format_address(envelope.from_)
+                date = envelope.date
+                message_id = _decode_fast(envelope.message_id)
+                in_reply_to = _decode_fast(envelope.in_reply_to)
+                flags = [f.decode() if isinstance(f, bytes) else f for f in data.get(b'FLAGS', [])]
+
+                db_rows.append((uid, subject, sender, date, flags, message_id, in_reply_to, "", None))
+
+                # Extract pure email for sender checking
+                sender_email = ""
+                if envelope.from_ and envelope.from_[0].mailbox and envelope.from_[0].host:
+                    sender_email = f"{_decode_fast(envelope.from_[0].mailbox)}@{_decode_fast(envelope.from_[0].host)}"
+                notif_items.append((sender, subject, sender_email))
+
+            # One transaction for the whole batch
+            db_manager.upsert_emails_bulk(account_id, folder_id, db_rows)
+
+            if not notif_items:
+                return
+
+            # One toast and at most one sound per account per poll
+            # Only the newest few were fetched; the count covers all new UIDs
+            if len(real_new_uids) == 1:
+                sender, subject, _ = notif_items[0]
+                notification_manager.show_toast(
+                    title=f"New Email: {sender}",
+                    message=subject,
+                    on_click=None # Could eventually open the email
+                )
+            else:
+                notification_manager.show_toast(
+                    title=f"{len(real_new_uids)} new emails for {email_addr}",
+                    message="; ".join(sender for sender, _, _ in notif_items[:3]),
+                    on_click=None
+                )
+
+            # Sender-specific sounds follow the newest message
+            notification_manager.play_sound(category='INBOX', sender=notif_items[-1][2], account_email=email_addr)
+
+        except Exception as e:
+            logger.error(f"Error polling {email_addr}: {e}")
+            self._discard_if_disconnected(client, email_addr, e)
+
+    @staticmethod
+    def _discard_if_disconnected(client, email_addr, error):
+        """
+        Drop the pooled session only when it is what failed; a DB, toast or sound
+        error says nothing about the connection. The bulk session is left alone.
+        """
+        if client is None or client.client is None or isinstance(error, _CONNECTION_ERRORS):
+            imap_pool.discard(email_addr, "meta")
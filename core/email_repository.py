@@ -1,25 +1,48 @@
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from ..database.db_manager import db_manager
 from ..core.account_manager import AccountManager
-from ..core.imap_client import IMAPClient
+from ..core.imap_pool import imap_pool
 import json
 
 logger = logging.getLogger(__name__)
 
+def _parse_flags(raw: Optional[str]) -> List[str]:
+    """Decode the JSON flags column; tolerates NULL/'null' and unreadable values."""
+    if not raw:
+        return []
+    try:
+        return json.loads(raw) or []
+    except ValueError:
+        return []
+
 class EmailRepository:
     def __init__(self, account_email: str):
         self.email = account_email
-        self.imap_client = IMAPClient(account_email)
         self.account_id = db_manager.get_account_id(account_email)
         if not self.account_id:
             # Create account if missing (e.g., legacy DB state).
             am = AccountManager()
-            acc = next((a for a in am.get_accounts() if a['email'] == account_email), None)
+            acc = next((a for a in am.get_accounts() if a.email == account_email), None)
             if acc:
-                db_manager.upsert_account(account_email, acc['imap_host'], acc['imap_port'], acc['smtp_host'], acc['smtp_port'])
-                self.account_id = db_manager.get_account_id(account_email)
+                self.account_id = db_manager.upsert_account(account_email, acc.imap_host, acc.imap_port, acc.smtp_host, acc.smtp_port)
+        # (folder_id, offset just past the last cached page served, (date_received, uid) of its last row),
+        # so paging forward through the cache continues from that row instead of skipping OFFSET rows
+        self._db_page_end: Optional[Tuple[int, int, Tuple[Any, int]]] = None
+
+    @property
+    def imap_client(self):
+        """
+        The pooled session for lists, flags and moves. Looked up on every use so a
+        session the pool replaced after an error isn't kept alive here.
+        """
+        return imap_pool.get(self.email)
+
+    @property
+    def bulk_client(self):
+        """Session for bodies and attachments, separate from the one serving lists and flags."""
+        return imap_pool.get(self.email, purpose="bulk")
 
     def fetch_threads(self, folder_name: str, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
@@ -33,6 +56,7 @@ class EmailRepository:
             threads = self.imap_client.fetch_threads(folder_name, limit, offset)
             if threads:
                 # Cache threads locally.
+                self._check_uidvalidity(folder_name, folder_id)
                 self._cache_threads(folder_id, threads)
                 return threads
         except Exception as e:
@@ -41,6 +65,22 @@ class EmailRepository:
         # Fallback to offline cache.
         return self._fetch_threads_from_db(folder_id, limit, offset)
 
+    def _check_uidvalidity(self, folder_name: str, folder_id: int):
+        """
+        Drop the folder's cached emails if the server renumbered its UIDs since
+        they were stored, so stale rows don't mix with the new ones.
+        """
+        uidvalidity = self.imap_client.uidvalidity(folder_name)
+        if uidvalidity is None:
+            return
+        stored = db_manager.get_folder_uidvalidity(folder_id)
+        if stored == uidvalidity:
+            return
+        if stored is not None:
+            logger.info(f"UIDVALIDITY of {folder_name} changed; dropping its cached emails")
+            db_manager.delete_folder_emails(self.account_id, folder_id)
+        db_manager.set_folder_uidvalidity(folder_id, uidvalidity)
+
     def get_cached_threads(self, folder_name: str, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
         Fetch threads from local cache only.
@@ -58,7 +98,7 @@ class EmailRepository:
         
         # Try online first.
         try:
-            body_data = self.imap_client.fetch_email_body(folder_name, uid)
+            body_data = self.bulk_client.fetch_email_body(folder_name, uid)
             if body_data:
                 # Cache body locally.
                 db_manager.upsert_email(
@@ -87,11 +127,29 @@ class EmailRepository:
                 }
         return {}
 
-    def move_emails(self, uids: List[int], target_folder: str) -> bool:
+    def prefetch_bodies(self, folder_name: str, uids: List[int]):
+        """
+        Fetch the bodies of messages the user is likely to open next in one
+        round trip, so opening them is served from the IMAP client's cache.
+        """
+        try:
+            self.bulk_client.fetch_email_bodies(folder_name, uids)
+        except Exception as e:
+            logger.warning(f"Body prefetch failed for {folder_name}: {e}")
+
+    def fetch_attachment(self, folder_name: str, uid: int, attachment: Dict[str, Any]) -> bytes:
+        """
+        Download the bytes of an attachment listed by fetch_email_body. Online only.
+        """
+        if attachment.get("data") is not None:
+            return attachment["data"]
+        return self.bulk_client.fetch_attachment(folder_name, uid, attachment.get("section", ""), attachment.get("encoding", ""))
+
+    def move_emails(self, uids: List[int], target_folder: str, source_folder: Optional[str] = None) -> bool:
         # Try online first.
         success = False
         try:
-            success = self.imap_client.move_emails(uids, target_folder)
+            success = self.imap_client.move_emails(uids, target_folder, source_folder=source_folder)
         except:
             logger.warning("Online move failed.")
 
@@ -99,11 +157,10 @@ class EmailRepository:
         if success:
             target_folder_id = db_manager.upsert_folder(self.account_id, target_folder)
             # Update folder_id for these emails
-            # Direct SQL update
-            placeholders = ','.join('?' * len(uids))
-            query = f"UPDATE emails SET folder_id = ? WHERE account_id = ? AND uid IN ({placeholders})"
-            params = [target_folder_id, self.account_id] + uids
-            db_manager.execute_commit(query, tuple(params))
+            # Pass the UID list as one JSON parameter: no SQLITE_MAX_VARIABLE_NUMBER limit
+            # and a single statement text regardless of how many UIDs are moved.
+            query = "UPDATE emails SET folder_id = ? WHERE account_id = ? AND uid IN (SELECT value FROM json_each(?))"
+            db_manager.execute_commit(query, (target_folder_id, self.account_id, json.dumps(list(uids))))
             
         return success
 
@@ -115,7 +172,7 @@ class EmailRepository:
          # Try online first.
         success = False
         try:
-            success = self.imap_client.add_flags(uids, flags)
+            success = self.imap_client.add_flags(uids, flags, source_folder=folder_name)
         except:
             pass
         
@@ -123,19 +180,22 @@ class EmailRepository:
              if folder_name:
                  folder_id = db_manager.get_folder_id(self.account_id, folder_name)
                  if folder_id:
-                     for uid in uids:
-                         current = db_manager.get_email_flags(self.account_id, folder_id, uid)
-                         current_flags = eval(current) if current else []
+                     # One SELECT for current flags, one batched UPDATE
+                     current = db_manager.get_email_flags_bulk(self.account_id, folder_id, uids)
+                     updates = []
+                     for uid, raw in current.items():
+                         current_flags = _parse_flags(raw)
                          for f in flags:
                              if f not in current_flags:
                                  current_flags.append(f)
-                         db_manager.update_email_flags(self.account_id, folder_id, uid, current_flags)
+                         updates.append((current_flags, self.account_id, folder_id, uid))
+                     db_manager.update_email_flags_many(updates)
         return success
 
-    def copy_emails(self, uids: List[int], target_folder: str) -> bool:
+    def copy_emails(self, uids: List[int], target_folder: str, source_folder: Optional[str] = None) -> bool:
         success = False
         try:
-            success = self.imap_client.copy_emails(uids, target_folder)
+            success = self.imap_client.copy_emails(uids, target_folder, source_folder=source_folder)
         except:
             logger.warning("Online copy failed.")
 
@@ -144,7 +204,7 @@ class EmailRepository:
     def remove_flags(self, uids: List[int], flags: List[str], folder_name: Optional[str] = None) -> bool:
         success = False
         try:
-            success = self.imap_client.remove_flags(uids, flags)
+            success = self.imap_client.remove_flags(uids, flags, source_folder=folder_name)
         except:
             pass
 
@@ -152,72 +212,84 @@ class EmailRepository:
             if folder_name:
                 folder_id = db_manager.get_folder_id(self.account_id, folder_name)
                 if folder_id:
-                    for uid in uids:
-                        current = db_manager.get_email_flags(self.account_id, folder_id, uid)
-                        current_flags = eval(current) if current else []
-                        current_flags = [f for f in current_flags if f not in flags]
-                        db_manager.update_email_flags(self.account_id, folder_id, uid, current_flags)
+                    # One SELECT for current flags, one batched UPDATE
+                    current = db_manager.get_email_flags_bulk(self.account_id, folder_id, uids)
+                    updates = []
+                    for uid, raw in current.items():
+                        current_flags = [f for f in _parse_flags(raw) if f not in flags]
+                        updates.append((current_flags, self.account_id, folder_id, uid))
+                    db_manager.update_email_flags_many(updates)
         return success
 
     # --- caching helpers ---
 
     def _cache_threads(self, folder_id, threads):
         """
-        Recursively save threads and children to DB.
+        Flatten the thread trees and save every node to DB in one transaction.
         """
-        for thread in threads:
-            self._save_email_node(folder_id, thread)
-    
-    def _save_email_node(self, folder_id, email_obj):
-        if not email_obj: return
-        
-        uid = email_obj.get("uid")
-        # If uid is None, it might be a container node?
-        if not isinstance(uid, int): return
+        rows = []
+        stack = list(threads)
+        while stack:
+            email_obj = stack.pop()
+            if not email_obj:
+                continue
+            stack.extend(email_obj.get("children", []))
 
-        db_manager.upsert_email(
-            self.account_id, 
-            folder_id, 
-            uid,
-            subject=email_obj.get("subject"),
-            sender=email_obj.get("sender"),
-            date=email_obj.get("date"),
-            flags=email_obj.get("flags"),
-            message_id=email_obj.get("_msg_id"),     # These keys come from _fetch_threads_fallback
-            in_reply_to=email_obj.get("_in_reply_to"),
-            references=json.dumps(email_obj.get("_references", [])),
-            body_text=None, # List fetch doesn't have body
-            body_html=None,
-            recipients=email_obj.get("to")
-        )
-        
-        for child in email_obj.get("children", []):
-            self._save_email_node(folder_id, child)
+            uid = email_obj.get("uid")
+            # If uid is None, it might be a container node?
+            if not isinstance(uid, int):
+                continue
+
+            rows.append((
+                uid,
+                email_obj.get("subject"),
+                email_obj.get("sender"),
+                email_obj.get("date"),
+                email_obj.get("flags"),
+                email_obj.get("_msg_id"),     # These keys come from _fetch_threads_fallback
+                email_obj.get("_in_reply_to"),
+                json.dumps(email_obj.get("_references", [])),
+                email_obj.get("to"),
+            ))
+
+        if rows:
+            # List fetch doesn't have body; the bulk upsert leaves stored bodies alone
+            db_manager.upsert_emails_bulk(self.account_id, folder_id, rows)
 
     def _fetch_threads_from_db(self, folder_id, limit, offset):
         """
         Reconstruct threads from flat DB rows.
         """
-        rows = db_manager.get_emails(self.account_id, folder_id, limit, offset)
+        before = None
+        if offset and self._db_page_end and self._db_page_end[:2] == (folder_id, offset):
+            before = self._db_page_end[2]
+        rows = db_manager.get_emails(self.account_id, folder_id, limit, offset, before=before)
         if not rows:
+            self._db_page_end = None
             return []
+        last = rows[-1]
+        self._db_page_end = (folder_id, offset + len(rows), (last['date_received'], last['uid']))
 
-        # Convert rows to dicts
+        # Convert rows to dicts, mapping Message-ID to UID in the same pass
         email_map = {}
+        msgid_to_uid = {}
         for row in rows:
             uid = row['uid']
+            msg_id = row['message_id']
             email_map[uid] = {
                 "uid": uid,
                 "subject": row['subject'],
                 "sender": row['sender'],
                 "to": row.get('recipients', ''),
                 "date": row['date_received'],
-                "flags": eval(row['flags']) if row['flags'] else [], # unsafe eval? flags is list repr str
+                "flags": _parse_flags(row['flags']),
                 "children": [],
-                "_msg_id": row['message_id'],
+                "_msg_id": msg_id,
                 "_in_reply_to": row['in_reply_to'],
                 "_references": json.loads(row['references_list']) if row['references_list'] else []
             }
+            if msg_id:
+                msgid_to_uid[msg_id] = uid
 
         # Build threads (similar to imap_client fallback)
         # However, `get_emails` only returns a page. 
@@ -240,14 +312,8 @@ class EmailRepository:
         # Yes, standard behavior for partial view.
         
         # We can map Message-ID to UID for linking if we had all UIDs.
-        # Here we only have rows.
+        # Here we only have rows (msgid_to_uid was built above).
         
-        # Mapping by MessageID within valid rows
-        msgid_to_uid = {}
-        for uid, obj in email_map.items():
-            if obj["_msg_id"]:
-                msgid_to_uid[obj["_msg_id"]] = uid
-                
         for uid, obj in email_map.items():
             parent_msgid = ""
             if obj["_references"]:
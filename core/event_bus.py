@@ -1,6 +1,6 @@
 import logging
-from collections import defaultdict
-from typing import Callable, Any, Dict, List
+import threading
+from typing import Callable, Any, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -9,39 +9,47 @@ class EventBus:
     A simple Publish-Subscribe event bus to decouple components.
     Allows different parts of the application to communicate without direct dependencies.
     """
-    _subscribers: Dict[str, List[Callable]] = defaultdict(list)
+    # Subscriber lists are immutable tuples replaced on (un)subscribe, so publish()
+    # can iterate a snapshot without locking even while other threads subscribe.
+    _subscribers: Dict[str, Tuple[Callable, ...]] = {}
+    _lock = threading.Lock()
 
     @classmethod
     def subscribe(cls, event_type: str, callback: Callable):
         """
         Subscribe a callback function to a specific event type.
         """
-        cls._subscribers[event_type].append(callback)
-        logger.debug(f"Subscribed {callback} to {event_type}")
+        with cls._lock:
+            cls._subscribers[event_type] = (*cls._subscribers.get(event_type, ()), callback)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Subscribed %s to %s", callback, event_type)
 
     @classmethod
     def publish(cls, event_type: str, data: Any = None):
         """
         Publish an event, notifying all subscribers.
         """
-        logger.debug(f"Publishing event: {event_type} with data: {data}")
-        if event_type in cls._subscribers:
-            for callback in cls._subscribers[event_type]:
-                try:
-                    callback(data)
-                except Exception as e:
-                    logger.error(f"Error in subscriber {callback} for event {event_type}: {e}")
+        # publish() runs for every UI/poller event; skip formatting when DEBUG is off
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Publishing event: %s with data: %s", event_type, data)
+        for callback in cls._subscribers.get(event_type, ()):
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error("Error in subscriber %s for event %s: %s", callback, event_type, e)
 
     @classmethod
     def unsubscribe(cls, event_type: str, callback: Callable):
         """
         Unsubscribe a callback from an event type.
         """
-        if event_type in cls._subscribers:
+        with cls._lock:
+            callbacks = list(cls._subscribers.get(event_type, ()))
             try:
-                cls._subscribers[event_type].remove(callback)
+                callbacks.remove(callback)
             except ValueError:
-                pass
+                return
+            cls._subscribers[event_type] = tuple(callbacks)
 
 
 # Global Event Types
@@ -1,34 +1,288 @@
 
+import functools
 import logging
+import socket
+import sys
 import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from imapclient import IMAPClient as IMAPLib
 from ..core.account_manager import AccountManager
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, FrozenSet, Tuple, Optional, Callable
+import base64
+import quopri
 import email
 import email.utils
 from email.header import decode_header
+from email.parser import BytesHeaderParser, BytesParser
 
 logger = logging.getLogger(__name__)
 
 import re
 
+# Servers cap request size; keep each FETCH to this many UIDs
+FETCH_CHUNK_SIZE = 100
+
+def _uids_to_sequence_set(uids, chunk_size: int = FETCH_CHUNK_SIZE) -> List[str]:
+    """
+    Compress UIDs into IMAP sequence-sets ("3:7,9,12:14"),
+    one string per chunk of at most chunk_size UIDs.
+    """
+    ordered = sorted(set(uids))
+    chunks = []
+    for i in range(0, len(ordered), chunk_size):
+        chunk = ordered[i:i + chunk_size]
+        spans = []
+        start = prev = chunk[0]
+        for uid in chunk[1:]:
+            if uid == prev + 1:
+                prev = uid
+                continue
+            spans.append(f"{start}:{prev}" if start != prev else str(start))
+            start = prev = uid
+        spans.append(f"{start}:{prev}" if start != prev else str(start))
+        chunks.append(",".join(spans))
+    return chunks
+
+def _parse_sequence_set(seq: bytes) -> List[int]:
+    """
+    Expand a sequence-set from an ESORT/ESEARCH reply, keeping its order.
+    A range runs in whichever direction it is written ("9:7" is 9, 8, 7).
+    """
+    uids = []
+    for part in seq.split(b','):
+        if b':' in part:
+            start, end = (int(n) for n in part.split(b':'))
+            step = 1 if end >= start else -1
+            uids.extend(range(start, end + step, step))
+        elif part:
+            uids.append(int(part))
+    return uids
+
+@functools.lru_cache(maxsize=8192)
+def _decode_header_cached(header_val: str) -> str:
+    """
+    Decode RFC 2047 encoded words. Cached because the same senders and
+    subjects recur across a mailbox and across folders.
+    """
+    result = []
+    for token, charset in decode_header(header_val):
+        if isinstance(token, bytes):
+            result.append(token.decode(charset or 'utf-8', errors='replace'))
+        else:
+            result.append(str(token))
+    return "".join(result)
+
+def _decode_fast(value) -> str:
+    """
+    Decode an address part (mailbox, host) from ENVELOPE. These never carry
+    RFC 2047 encoded words, so a plain UTF-8 decode is enough.
+    """
+    if not value:
+        return ""
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+def _decode_value(header_val) -> str:
+    """
+    Decode a header value (bytes or str) that may hold RFC 2047 encoded words.
+    """
+    if not header_val:
+        return ""
+    if isinstance(header_val, bytes):
+        header_val = header_val.decode('utf-8', errors='replace')
+    else:
+        header_val = str(header_val)
+
+    # Fast path: most headers carry no RFC 2047 encoded words, so skip decode_header
+    if '=?' not in header_val:
+        return header_val
+    
+    return _decode_header_cached(header_val)
+
+@functools.lru_cache(maxsize=8192)
+def _format_one_address(name, mailbox, host) -> str:
+    """
+    Render one ENVELOPE address as "Name <mailbox@host>". Cached on the raw
+    parts, since the same correspondents recur across a folder.
+    """
+    # Only display names may be encoded; mailbox and host decode directly
+    name = _decode_value(name) if name else ""
+    email_addr = f"{_decode_fast(mailbox)}@{_decode_fast(host)}"
+    return f"{name} <{email_addr}>" if name else email_addr
+
+# Any run of leading Re:/Fwd:/FW: prefixes, stripped in one pass
+_SUBJECT_PREFIX_RE = re.compile(r'^(?:\s*(?:re|fwd|fw)\s*:\s*)+', re.IGNORECASE)
+# Threading headers, as lower-cased header names
+_THREAD_HEADERS = frozenset((b'date', b'message-id', b'in-reply-to', b'references'))
+# Headers-only parser for blocks the line scanner can't make sense of
+_HDR_PARSER = BytesHeaderParser()
+# Full-message parser for bodies; stateless between calls, so one is shared
+_MSG_PARSER = BytesParser()
+
+def _scan_headers(blob: bytes) -> Dict[str, str]:
+    """
+    Pull Date / Message-ID / In-Reply-To / References out of a header block
+    with a line scanner instead of building an email.message.Message.
+    Folded lines are unfolded. Keys are lower-cased; the first occurrence
+    of a header wins, as with Message.get().
+    """
+    headers = {}
+    name = None
+    parts = None  # value lines of the wanted header being read
+    for line in blob.split(b'\n'):
+        if line[:1] in (b' ', b'\t'):
+            if parts is not None:
+                parts.append(line.strip())
+            continue
+        if parts is not None and name not in headers:
+            headers[name] = b' '.join(parts).decode('utf-8', errors='replace').strip()
+        parts = None
+        colon = line.find(b':')
+        if colon > 0:
+            key = line[:colon].rstrip().lower()
+            if key in _THREAD_HEADERS:
+                name = key.decode('ascii')
+                parts = [line[colon + 1:].strip()]
+    if parts is not None and name not in headers:
+        headers[name] = b' '.join(parts).decode('utf-8', errors='replace').strip()
+
+    if not headers and blob.strip():
+        # Odd line endings or layout; let the email package sort it out
+        msg = _HDR_PARSER.parsebytes(blob)
+        for key in _THREAD_HEADERS:
+            value = msg.get(key.decode('ascii'))
+            if value is not None:
+                headers[key.decode('ascii')] = str(value).strip()
+    return headers
+
+class _ThreadRecord:
+    """
+    What the threading code caches per message. Slotted rather than a dict,
+    since a folder's worth of these stays in _thread_cache. addrs holds the
+    raw ENVELOPE addresses until _decode_addresses fills in sender/to/cc.
+    """
+    __slots__ = ("uid", "subject", "addrs", "sender", "to", "cc", "date", "flags",
+                 "msg_id", "in_reply_to", "references", "gm_thrid")
+
+    def __init__(self, uid: int, subject: str, addrs: Optional[tuple], date, flags: List[str],
+                 msg_id: str, in_reply_to: str, references: Tuple[str, ...], gm_thrid):
+        self.uid = uid
+        self.subject = subject
+        self.addrs = addrs
+        self.sender = self.to = self.cc = ""
+        self.date = date
+        self.flags = flags
+        self.msg_id = msg_id
+        self.in_reply_to = in_reply_to
+        self.references = references
+        self.gm_thrid = gm_thrid
+
+    def as_email(self) -> Dict[str, Any]:
+        """A fresh email dict for the threading tiers to link and strip."""
+        email_obj = {"uid": self.uid, "subject": self.subject}
+        if self.addrs is None:
+            email_obj.update(sender=self.sender, to=self.to, cc=self.cc)
+        else:
+            email_obj["_addrs"] = self.addrs
+        email_obj.update(
+            date=self.date,
+            flags=list(self.flags),
+            children=[],
+            _msg_id=self.msg_id,
+            _in_reply_to=self.in_reply_to,
+            _references=self.references,
+            _gm_thrid=self.gm_thrid
+        )
+        return email_obj
+
+def _decode_transfer_encoding(raw: bytes, encoding: str) -> bytes:
+    """
+    Undo a part's Content-Transfer-Encoding. Tolerates base64 cut short by a partial fetch.
+    """
+    encoding = (encoding or "").lower()
+    if encoding == "base64":
+        raw = b"".join(raw.split())
+        return base64.b64decode(raw[:len(raw) - len(raw) % 4])
+    if encoding == "quoted-printable":
+        return quopri.decodestring(raw)
+    return raw
+
+# Errors meaning the session itself is gone (server dropped it, network blip)
+_CONNECTION_ERRORS = (IMAPLib.AbortError, socket.error)
+
+def _reconnect_once(method):
+    """
+    Re-run a call once on a fresh login if the session dropped while it ran.
+    Methods report a dropped session by clearing self.client via _drop_if_disconnected.
+    Only wrap methods that SELECT their own folder (move/flag calls do so when
+    given source_folder): a fresh login has nothing selected. Never wrap a
+    command that isn't idempotent, such as COPY.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        had_client = self.client is not None
+        result = method(self, *args, **kwargs)
+        if had_client and self.client is None:
+            with self._lock:
+                # Another thread sharing the session may have logged in again already
+                if self.client is None:
+                    logger.info(f"IMAP session for {self.email} dropped; reconnecting")
+                    self._connect()
+            if self.client:
+                result = method(self, *args, **kwargs)
+        return result
+    return wrapper
+
 class IMAPClient:
+    # Folder lists rarely change; re-LIST at most this often
+    FOLDERS_TTL = 300
+    # Threading records kept per folder by fetch_threads (most recently used UIDs)
+    ENVELOPE_CACHE_SIZE = 5000
+    # Parsed message bodies kept for reopening and prefetch
+    BODY_CACHE_SIZE = 50
+    # Newest messages the threading fallback looks at (at least this many)
+    THREAD_WINDOW = 2000
+    # Out-of-window parents looked up by Message-ID per fallback call
+    PARENT_LOOKUP_LIMIT = 50
+
     def __init__(self, account_email: str):
         self.email = account_email
         self.account_manager = AccountManager()
         self.client = None
         self.imap_host = ""
+        self._is_gmail_host = False  # host name looks like Gmail / Google Workspace
         self._lock = threading.Lock()
         self._selected_folder = None
         self._selected_readonly = None
+        self._selected_modseq = None  # HIGHESTMODSEQ reported by the last SELECT
+        self._caps: FrozenSet[bytes] = frozenset()  # kept across reconnects
+        self._folders_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None  # (fetched_at, folders)
+        self._thread_cache: Dict[str, "OrderedDict[int, _ThreadRecord]"] = {}  # {folder: {uid: threading record}}
+        self._last_modseq: Dict[str, int] = {}  # {folder: MODSEQ the cached flags are current to}
+        self._uidvalidity: Dict[str, int] = {}  # {folder: UIDVALIDITY from its last SELECT}
+        self._body_cache: "OrderedDict[Tuple[str, int], Dict]" = OrderedDict()  # {(folder, uid): body dict}
         self._connect()
 
+    @classmethod
+    def connect_all(cls, emails: List[str]) -> List["IMAPClient"]:
+        """
+        Log in to several accounts in parallel, so startup waits for the
+        slowest login instead of the sum of all of them.
+        """
+        if not emails:
+            return []
+        with ThreadPoolExecutor(max_workers=min(8, len(emails))) as executor:
+            return list(executor.map(cls, emails))
+
     def _connect(self):
         """
         Connects to the IMAP server.
         """
         accounts = self.account_manager.get_accounts()
-        account = next((a for a in accounts if a['email'] == self.email), None)
+        account = next((a for a in accounts if a.email == self.email), None)
         
         if not account:
             logger.error(f"Account {self.email} not found.")
@@ -40,39 +294,177 @@ class IMAPClient:
                 logger.error(f"No password found for {self.email}")
                 return
 
-            self.imap_host = account['imap_host']
-            self.client = IMAPLib(account['imap_host'], port=account['imap_port'], ssl=True)
+            self.imap_host = account.imap_host
+            host = self.imap_host.lower()
+            self._is_gmail_host = 'gmail' in host or 'google' in host
+            # A fresh session has nothing selected yet
+            self._selected_folder = None
+            self._selected_readonly = None
+            self._selected_modseq = None
+            self.client = IMAPLib(account.imap_host, port=account.imap_port, ssl=True)
             self.client.login(self.email, password)
+            # Same server on every reconnect, so ask for CAPABILITY only once
+            if not self._caps:
+                self._caps = frozenset(self.client.capabilities())
+            if self.has_condstore() and self.has_capability(b'ENABLE'):
+                # So SELECT reports HIGHESTMODSEQ (RFC 7162)
+                self.client.enable('CONDSTORE')
             logger.info(f"Logged in to {self.email}")
         except Exception as e:
             logger.error(f"Failed to connect to IMAP for {self.email}: {e}")
             self.client = None
 
+    def has_capability(self, name: bytes) -> bool:
+        return name.upper() in self._caps
+
+    def has_sort(self) -> bool:
+        return b'SORT' in self._caps
+
+    def has_esort(self) -> bool:
+        return b'ESORT' in self._caps
+
+    def has_thread_references(self) -> bool:
+        return b'THREAD=REFERENCES' in self._caps
+
+    def has_x_gm_ext_1(self) -> bool:
+        return b'X-GM-EXT-1' in self._caps
+
+    def has_move(self) -> bool:
+        return b'MOVE' in self._caps
+
+    def has_uidplus(self) -> bool:
+        return b'UIDPLUS' in self._caps
+
+    def has_condstore(self) -> bool:
+        return b'CONDSTORE' in self._caps
+
+    def _drop_if_disconnected(self, error: Exception):
+        """
+        Forget the session if the error means the connection is gone, so the
+        next call (or _reconnect_once) logs in again instead of reusing a dead socket.
+        """
+        if not isinstance(error, _CONNECTION_ERRORS) or not self.client:
+            return
+        logger.warning(f"IMAP connection lost for {self.email}: {error}")
+        try:
+            self.client.shutdown()
+        except Exception:
+            pass
+        self.client = None
+        self._selected_folder = None
+        self._selected_readonly = None
+        self._selected_modseq = None
+
+    @_reconnect_once
     def list_folders(self) -> List[Dict[str, Any]]:
         """
-        List all folders on the server.
+        List all folders on the server. Cached for FOLDERS_TTL seconds.
         """
+        cached = self._folders_cache
+        if cached and time.monotonic() - cached[0] < self.FOLDERS_TTL:
+            return list(cached[1])
+
         if not self.client:
             self._connect()
         
         if not self.client:
             return []
 
-        try:
+        with self._lock:
+          try:
             folders = self.client.list_folders()
-            # folders is a list of (flags, delimiter, name)
-            result = []
-            for flags, delimiter, name in folders:
-                result.append({
-                    "name": name,
-                    "flags": flags,
-                    "delimiter": delimiter
-                })
-            return result
-        except Exception as e:
+          except Exception as e:
             logger.error(f"Error listing folders for {self.email}: {e}")
+            self._drop_if_disconnected(e)
             return []
 
+        # folders is a list of (flags, delimiter, name)
+        result = []
+        for flags, delimiter, name in folders:
+            result.append({
+                "name": name,
+                "flags": flags,
+                "delimiter": delimiter
+            })
+        self._folders_cache = (time.monotonic(), result)
+        return list(result)
+
+    def _search_newest_first(self) -> List[int]:
+        """
+        UIDs of the selected folder, newest first. Uses server-side SORT when
+        advertised so the client doesn't sort the whole mailbox itself.
+        The caller MUST hold self._lock (or otherwise own the session).
+        """
+        if self.has_sort():
+            try:
+                if self.has_esort():
+                    return self._esort_all(b'(REVERSE ARRIVAL)')
+                return self.client.sort(['REVERSE', 'ARRIVAL'], ['ALL'])
+            except IMAPLib.Error as e:
+                if isinstance(e, _CONNECTION_ERRORS):
+                    raise
+                logger.warning(f"SORT failed for {self.email}, sorting locally: {e}")
+        messages = self.client.search(['ALL'])
+        messages.sort(reverse=True) # Newest first
+        return messages
+
+    def _esort_all(self, sort_criteria: bytes) -> List[int]:
+        """
+        UID SORT RETURN (ALL) (RFC 5267): the server answers with a compact
+        sequence-set ("9:7,3,5") in sort order instead of one number per message.
+        The caller MUST hold self._lock (or otherwise own the session).
+        """
+        # imapclient has no ESORT call; its raw command helper sends it and collects the ESEARCH reply
+        args = [b'RETURN', b'(ALL)', sort_criteria, b'UTF-8', b'ALL']
+        data = self.client._raw_command_untagged(b'SORT', args, response_name='ESEARCH', unpack=True)
+        if not data:
+            return []
+        tokens = data.split()
+        if b'ALL' not in tokens:
+            return []
+        return _parse_sequence_set(tokens[tokens.index(b'ALL') + 1])
+
+    def _refresh_changed_flags(self, folder_name: str):
+        """
+        CONDSTORE refresh: fetch FLAGS only for messages changed since the
+        MODSEQ the folder's threading records were last synced to, across the whole folder.
+        The caller MUST hold self._lock and have just selected folder_name.
+        """
+        records = self._thread_cache.get(folder_name)
+        since = self._last_modseq.get(folder_name)
+        if since is None:
+            # Entries cached before we had a sync point can't be trusted; start over
+            if records:
+                records.clear()
+        elif records:
+            response = self.client.fetch('1:*', ['FLAGS', 'MODSEQ'], modifiers=[f'CHANGEDSINCE {since}'])
+            for uid, data in response.items():
+                modseq = data.get(b'MODSEQ')
+                if isinstance(modseq, (tuple, list)):
+                    modseq = modseq[0]
+                if modseq:
+                    since = max(since, modseq)
+                if uid in records:
+                    records[uid].flags = [f.decode() if isinstance(f, bytes) else f for f in data[b'FLAGS']]
+        # Everything cached (and fetched from here on) is current as of this SELECT at least
+        self._last_modseq[folder_name] = max(since or 0, self._selected_modseq)
+
+    def _fetch_chunked(self, uids, keys) -> Dict[int, Dict]:
+        """
+        FETCH in sequence-set chunks and merge the responses.
+        The caller MUST hold self._lock (or otherwise own the session).
+        """
+        response = {}
+        for seq_set in _uids_to_sequence_set(uids):
+            response.update(self.client.fetch(seq_set, keys))
+        return response
+
+    def invalidate_folders(self):
+        """
+        Drop the cached folder list so the next list_folders() asks the server.
+        """
+        self._folders_cache = None
+
     def select_folder(self, folder_name: str, readonly: bool = False):
         """
         Select a folder. Tracks current selection to avoid redundant selects.
@@ -84,15 +476,48 @@ class IMAPClient:
             # Skip re-select if already on the same folder with same mode
             if self._selected_folder == folder_name and self._selected_readonly == readonly:
                 return
-            self.client.select_folder(folder_name, readonly=readonly)
+            info = self.client.select_folder(folder_name, readonly=readonly)
             self._selected_folder = folder_name
             self._selected_readonly = readonly
+            uidvalidity = info.get(b'UIDVALIDITY')
+            if uidvalidity is not None:
+                if self._uidvalidity.get(folder_name, uidvalidity) != uidvalidity:
+                    # UIDs were renumbered; nothing cached for the folder is valid any more
+                    logger.info(f"UIDVALIDITY of '{folder_name}' changed, clearing its caches")
+                    self._forget_folder(folder_name)
+                self._uidvalidity[folder_name] = uidvalidity
+            # Absent when CONDSTORE is off or the mailbox is NOMODSEQ
+            self._selected_modseq = info.get(b'HIGHESTMODSEQ') if self.has_condstore() else None
             logger.debug(f"Selected folder '{folder_name}' (readonly={readonly})")
         except Exception as e:
             self._selected_folder = None
             self._selected_readonly = None
+            self._selected_modseq = None
             logger.error(f"Error selecting folder {folder_name}: {e}")
+            self._drop_if_disconnected(e)
 
+    def uidvalidity(self, folder_name: str) -> Optional[int]:
+        """UIDVALIDITY the server reported when folder_name was last selected, if any."""
+        return self._uidvalidity.get(folder_name)
+
+    def _select_for_update(self, source_folder: Optional[str]) -> bool:
+        """
+        Select source_folder read-write for a STORE/COPY/MOVE and report whether that worked.
+        The session is shared with the poller and list loaders, so the folder is selected in
+        the same locked block as the command rather than trusted from an earlier SELECT.
+        Without source_folder the current read-write selection is used, if there is one.
+        The caller MUST hold self._lock when calling this method.
+        """
+        if source_folder is not None:
+            self.select_folder(source_folder, readonly=False)
+            if self._selected_folder != source_folder:
+                return False
+        if self._selected_folder is None or self._selected_readonly is not False:
+            logger.error(f"No folder selected read-write for {self.email}")
+            return False
+        return True
+
+    @_reconnect_once
     def create_folder(self, folder_name: str) -> bool:
         """
         Create a new folder.
@@ -102,13 +527,17 @@ class IMAPClient:
         if not self.client:
             return False
             
-        try:
+        with self._lock:
+          try:
             self.client.create_folder(folder_name)
-            return True
-        except Exception as e:
+          except Exception as e:
             logger.error(f"Error creating folder {folder_name}: {e}")
+            self._drop_if_disconnected(e)
             return False
+        self.invalidate_folders()
+        return True
 
+    @_reconnect_once
     def fetch_emails(self, folder_name: str, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
         Fetch emails from the selected folder.
@@ -120,10 +549,21 @@ class IMAPClient:
         if not self.client:
             return []
 
+        with self._lock:
+            return self._fetch_emails_locked(folder_name, limit, offset)
+
+    def _fetch_emails_locked(self, folder_name: str, limit: int, offset: int) -> List[Dict]:
+        """
+        fetch_emails without the reconnect wrapper, for callers already holding the
+        session (the threading fallback): _reconnect_once takes self._lock itself.
+        The caller MUST hold self._lock.
+        """
+        if not self.client:
+            return []
+
         try:
             self.select_folder(folder_name, readonly=True)
-            messages = self.client.search(['ALL'])
-            messages.sort(reverse=True) # Newest first
+            messages = self._search_newest_first()
             
             start = offset
             end = offset + limit
@@ -134,42 +574,36 @@ class IMAPClient:
 
             # content_data = self.client.fetch(batch_uids, ['BODY.PEEK[]']) # Takes too much bandwidth, just headers first
             # We want ENVELOPE and FLAGS
-            response = self.client.fetch(batch_uids, ['ENVELOPE', 'FLAGS', 'INTERNALDATE', 'BODYSTRUCTURE'])
-            
+            response = self._fetch_chunked(batch_uids, ['ENVELOPE', 'FLAGS', 'INTERNALDATE', 'BODYSTRUCTURE'])
+
             emails = []
-            for uid, data in response.items():
+            for uid in batch_uids: # Newest first
+                data = response.get(uid)
+                if not data:
+                    continue
                 envelope = data[b'ENVELOPE']
-                
-                # Decode subject
-                subject = self._decode_str(envelope.subject)
-                sender = self._format_address(envelope.from_)
-                to = self._format_address(envelope.to)
-                cc = self._format_address(envelope.cc)
-                date = envelope.date
-                flags = data[b'FLAGS']
-                
-                # Extract Threading Info
-                message_id = self._decode_str(envelope.message_id)
-                in_reply_to = self._decode_str(envelope.in_reply_to)
-
                 emails.append({
                     "uid": uid,
-                    "subject": subject,
-                    "sender": sender,
-                    "to": to,
-                    "cc": cc,
-                    "date": date,
-                    "flags": [f.decode() if isinstance(f, bytes) else f for f in flags],
-                    "message_id": message_id,
-                    "in_reply_to": in_reply_to,
+                    "subject": self._decode_str(envelope.subject),
+                    "sender": self._format_address(envelope.from_),
+                    "to": self._format_address(envelope.to),
+                    "cc": self._format_address(envelope.cc),
+                    "date": envelope.date,
+                    "flags": [f.decode() if isinstance(f, bytes) else f for f in data[b'FLAGS']],
+                    # Extract Threading Info
+                    # Message-IDs are plain ASCII; never RFC 2047 encoded
+                    "message_id": _decode_fast(envelope.message_id),
+                    "in_reply_to": _decode_fast(envelope.in_reply_to),
                     "references": [] 
                 })
             
             return emails
         except Exception as e:
             logger.error(f"Error fetching emails from {folder_name}: {e}")
+            self._drop_if_disconnected(e)
             return []
 
+    @_reconnect_once
     def fetch_threads(self, folder_name: str, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
         Fetch emails as threads.
@@ -185,143 +619,157 @@ class IMAPClient:
         with self._lock:
           try:
             self.select_folder(folder_name, readonly=True)
-            
-            # Fetch threaded UIDs
-            try:
-                # Returns nested tuples: ((uid, (reply1, reply2)), ...)
-                # Example: ((1, (2,)), (3,))
-                threads = self.client.thread(algorithm='REFERENCES', criteria='ALL')
-            except Exception as e:
-                logger.warning(f"THREAD command failed, falling back to header-based threading: {e}")
-                return self._fetch_threads_fallback(folder_name, limit, offset)
-
-            if not threads:
-                return []
-            
-            # Flatten to fetch envelopes
-            all_uids = []
-            def extract_uids(node):
-                if isinstance(node, (list, tuple)):
-                    for item in node:
-                        extract_uids(item)
-                else:
-                    if node: # simple uid
-                        all_uids.append(node)
-            
-            extract_uids(threads)
-            
-            # Fetch Metadata (batch)
-            # Fetch ENVELOPE, FLAGS, INTERNALDATE for all UIDs in threads
-            # Filter duplicates if any
-            unique_uids = list(set(all_uids))
-            if not unique_uids:
-                return []
 
-            response = self.client.fetch(unique_uids, ['ENVELOPE', 'FLAGS', 'INTERNALDATE', 'BODY.PEEK[HEADER.FIELDS (DATE)]'])
-            email_map = {}
-            for uid, data in response.items():
-                envelope = data[b'ENVELOPE']
-
-                # Parse Date header for timezone-aware datetime
-                parsed_date = None
-                for key in data.keys():
-                    if isinstance(key, bytes) and b'HEADER.FIELDS' in key:
-                        try:
-                            hdr_msg = email.message_from_bytes(data[key])
-                            date_str = hdr_msg.get('Date', '')
-                            if date_str:
-                                parsed_date = email.utils.parsedate_to_datetime(date_str)
-                        except Exception:
-                            pass
-                        break
-
-                email_map[uid] = {
-                    "uid": uid,
-                    "subject": self._decode_str(envelope.subject),
-                    "sender": self._format_address(envelope.from_),
-                    "to": self._format_address(envelope.to),
-                    "cc": self._format_address(envelope.cc),
-                    "date": parsed_date or data.get(b'INTERNALDATE') or envelope.date,
-                    "flags": [f.decode() if isinstance(f, bytes) else f for f in data[b'FLAGS']],
-                    "message_id": self._decode_str(envelope.message_id),
-                    "in_reply_to": self._decode_str(envelope.in_reply_to),
-                    "references": [], # Missing in envelope
-                    "children": []
-                }
-
-            # Reconstruct Thread Structure
-            result = []
-            
-            def build_thread_node(node):
-                # Handle THREAD tuples: (uid1, uid2, uid3, ...) means uid1→uid2→uid3 chain
-                # Also handles nested: (uid1, (uid2, uid3)) 
-                
-                if isinstance(node, (list, tuple)):
-                    if not node: return None
-                    
-                    # Collect all items: ints are UIDs, tuples are sub-threads
-                    items = list(node)
-                    
-                    # Build a chain: first int UID is root, subsequent ints are chained children
-                    root_obj = None
-                    current_parent = None
-                    
-                    for item in items:
-                        if isinstance(item, int):
-                            obj = email_map.get(item)
-                            if obj:
-                                obj['children'] = []
-                                if root_obj is None:
-                                    root_obj = obj
-                                    current_parent = obj
-                                else:
-                                    current_parent['children'].append(obj)
-                                    current_parent = obj
-                        elif isinstance(item, (list, tuple)):
-                            # Nested sub-thread
-                            child_obj = build_thread_node(item)
-                            if child_obj and current_parent:
-                                current_parent['children'].append(child_obj)
-                            elif child_obj:
-                                root_obj = child_obj
-                                current_parent = child_obj
-                    
-                    return root_obj
-                else:
-                    # Just a UID
-                    obj = email_map.get(node)
-                    if obj:
-                        obj['children'] = []
-                    return obj
-
-            # Process ALL top-level threads first (no slicing yet)
-            threads_list = list(threads)
-            
-            for thread_node in threads_list:
-                thread_obj = build_thread_node(thread_node)
-                if thread_obj:
-                    result.append(thread_obj)
-            
-            # Merge orphan roots by subject across ALL threads
-            result = self._merge_by_subject(result)
-
-            # NOW paginate on the merged thread list
-            return result[offset:offset+limit]
+            # Gmail has no THREAD command but exposes its own thread ids; skip the doomed attempt,
+            # as for any server that doesn't advertise THREAD=REFERENCES
+            if self._is_gmail() or not self.has_thread_references():
+                link = self._fetch_threads_fallback(folder_name, limit, offset)
+            else:
+                link = self._fetch_thread_response(folder_name, limit, offset)
           except Exception as e:
             logger.error(f"Error fetching threads from {folder_name}: {e}")
+            self._drop_if_disconnected(e)
             return []
 
+        # Linking and subject merging only touch our own copies of the records, so run
+        # them after releasing the session; body and flag calls don't wait on a big folder
+        try:
+            return link()
+        except Exception as e:
+            logger.error(f"Error threading {folder_name}: {e}")
+            return []
+
+    def _fetch_thread_response(self, folder_name: str, limit: int, offset: int) -> Callable[[], List[Dict]]:
+        """
+        Fetch the server's THREAD=REFERENCES tree and the records it names.
+        Returns a callable that builds the thread dicts; it does no I/O and
+        must be called without holding self._lock.
+        The caller MUST hold self._lock and have just selected folder_name.
+        """
+        # Fetch threaded UIDs
+        try:
+            # Returns nested tuples: ((uid, (reply1, reply2)), ...)
+            # Example: ((1, (2,)), (3,))
+            threads = self.client.thread(algorithm='REFERENCES', criteria='ALL')
+        except Exception as e:
+            logger.warning(f"THREAD command failed, falling back to header-based threading: {e}")
+            self._drop_if_disconnected(e)
+            return self._fetch_threads_fallback(folder_name, limit, offset)
+
+        if not threads:
+            return lambda: []
+        
+        # Flatten to fetch envelopes
+        # Iterative walk; deep reply chains would otherwise hit the recursion limit.
+        # Duplicates are dropped as they are found rather than in a second pass.
+        unique_uids = set()
+        stack = [threads]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, (list, tuple)):
+                stack.extend(node)
+            elif node: # simple uid
+                unique_uids.add(node)
+        
+        # Fetch Metadata (batch)
+        # Fetch ENVELOPE, FLAGS, INTERNALDATE for all UIDs in threads
+        if not unique_uids:
+            return lambda: []
+
+        # Same records (and cache) as the header-based fallback
+        cache, _ = self._load_thread_records(folder_name, list(unique_uids), False)
+        email_map = {}
+        for uid in unique_uids:
+            record = cache.get(uid)
+            if record is None:
+                continue
+            cache.move_to_end(uid)
+            obj = record.as_email()
+            # This path hands the threading ids out under their public names
+            obj["message_id"] = obj.pop("_msg_id")
+            obj["in_reply_to"] = obj.pop("_in_reply_to")
+            obj["references"] = list(obj.pop("_references"))
+            del obj["_gm_thrid"]
+            email_map[uid] = obj
+        while len(cache) > self.ENVELOPE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+        return functools.partial(self._link_thread_response, threads, email_map, cache, limit, offset)
+
+    def _link_thread_response(self, threads, email_map: Dict[int, Dict], cache: "OrderedDict[int, _ThreadRecord]",
+                              limit: int, offset: int) -> List[Dict]:
+        """
+        Build thread dicts from a THREAD response. Caller must NOT hold self._lock.
+        """
+        # Reconstruct Thread Structure in one explicit-stack walk (no recursion,
+        # so deep reply chains can't hit the recursion limit). Each frame is
+        # [items, next_index, root_obj, current_parent]: the first UID of a
+        # sub-thread is its root and later UIDs chain onto the one before.
+        # The bottom frame is the response itself; each of its items is a thread.
+        # Handles THREAD tuples: (uid1, uid2, uid3, ...) means uid1→uid2→uid3 chain
+        # Also handles nested: (uid1, (uid2, uid3))
+        result = []
+        stack = [[threads, 0, None, None]]
+        while stack:
+            frame = stack[-1]
+            items, i = frame[0], frame[1]
+
+            if i == len(items):
+                # Sub-thread done; hand its root to the enclosing frame
+                stack.pop()
+                child_obj = frame[2]
+                if not child_obj:
+                    continue
+                if len(stack) == 1:
+                    result.append(child_obj)
+                    continue
+                parent = stack[-1]
+                if parent[3]:
+                    parent[3]['children'].append(child_obj)
+                else:
+                    parent[2] = child_obj
+                    parent[3] = child_obj
+                continue
+
+            frame[1] = i + 1
+            item = items[i]
+            if isinstance(item, (list, tuple)):
+                # Nested sub-thread
+                stack.append([item, 0, None, None])
+                continue
+            obj = email_map.get(item)
+            if not obj:
+                continue
+            obj['children'] = []
+            if len(stack) == 1:
+                # A thread of a single message
+                result.append(obj)
+            elif frame[2] is None:
+                frame[2] = obj
+                frame[3] = obj
+            else:
+                frame[3]['children'].append(obj)
+                frame[3] = obj
+        
+        # Merge orphan roots by subject across ALL threads
+        result = self._merge_by_subject(result)
+
+        # NOW paginate on the merged thread list
+        result = result[offset:offset+limit]
+        self._decode_addresses(result, cache)
+        return result
+
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _normalize_subject(subject: str) -> str:
         """Strip Re:/Fwd:/FW: prefixes and whitespace for subject-based grouping."""
         if not subject:
             return ""
-        # Repeatedly strip common prefixes
-        s = subject.strip()
-        pattern = re.compile(r'^\s*(re|fwd|fw)\s*:\s*', re.IGNORECASE)
-        while pattern.match(s):
-            s = pattern.sub('', s, count=1).strip()
-        return s.lower()
+        subject = subject.strip()
+        # Every prefix starts with r or f; most subjects skip the regex entirely
+        if subject[:1] not in "rRfF":
+            return subject.lower()
+        return _SUBJECT_PREFIX_RE.sub('', subject, count=1).strip().lower()
 
     @classmethod
     def _merge_by_subject(cls, roots: List[Dict]) -> List[Dict]:
@@ -330,222 +778,371 @@ class IMAPClient:
         normalized subjects into a single thread (oldest as root).
         This catches mailing-list threads that the server didn't group.
         """
-        subject_groups = {}  # normalized_subject -> [root_obj, ...]
+        subject_groups = defaultdict(list)  # normalized_subject -> [root_obj, ...]
         final_roots = []
 
         for root_obj in roots:
             norm_subj = cls._normalize_subject(root_obj.get("subject", ""))
             if norm_subj and len(norm_subj) > 3:  # Ignore very short subjects
-                subject_groups.setdefault(norm_subj, []).append(root_obj)
+                subject_groups[norm_subj].append(root_obj)
             else:
                 final_roots.append(root_obj)
 
-        for norm_subj, group in subject_groups.items():
+        for group in subject_groups.values():
             if len(group) == 1:
                 final_roots.append(group[0])
-            else:
-                # Multiple messages — group under the oldest as root
-                group.sort(key=lambda x: x.get("date") or 0)
-                thread_root = group[0]
-                for sibling in group[1:]:
-                    # Move sibling's existing children to root if any
-                    thread_root["children"].extend(sibling.get("children", []))
-                    sibling["children"] = []
-                    thread_root["children"].append(sibling)
-                final_roots.append(thread_root)
-
-        # Sort by newest date in thread
-        def thread_newest_date(root):
-            dates = [root.get("date") or 0]
-            for c in root.get("children", []):
-                dates.append(c.get("date") or 0)
-            return max(dates)
-
-        final_roots.sort(key=thread_newest_date, reverse=True)
+                continue
+            # Multiple messages — group under the oldest as root
+            group.sort(key=lambda x: x.get("date") or 0)
+            thread_root = group[0]
+            children = thread_root["children"]
+            for sibling in group[1:]:
+                # Move sibling's existing children to root if any
+                children.extend(sibling.get("children", []))
+                sibling["children"] = []
+                children.append(sibling)
+            final_roots.append(thread_root)
+
+        # Sort by newest date in thread, worked out once per root
+        newest = {
+            id(root): max([root.get("date") or 0] + [c.get("date") or 0 for c in root.get("children", [])])
+            for root in final_roots
+        }
+        final_roots.sort(key=lambda root: newest[id(root)], reverse=True)
         return final_roots
 
     def _is_gmail(self) -> bool:
-        """Check if the connected server is Gmail."""
-        return 'gmail' in self.imap_host.lower() or 'google' in self.imap_host.lower()
+        """Check if the server supports Gmail extensions (X-GM-THRID)."""
+        return self._is_gmail_host or self.has_x_gm_ext_1()
+
+    def _load_thread_records(self, folder_name: str, uids: List[int], use_gmail_threads: bool) -> Tuple["OrderedDict[int, _ThreadRecord]", List[str]]:
+        """
+        Bring _thread_cache up to date for uids: envelope and threading headers
+        in one FETCH per chunk for new UIDs, flags only for cached ones.
+        Returns the folder's cache and the FETCH keys the server accepted.
+        The caller MUST hold self._lock and have just selected folder_name.
+        """
+        fetch_keys = [
+            'ENVELOPE',
+            'FLAGS',
+            'INTERNALDATE',
+            'BODY.PEEK[HEADER.FIELDS (DATE MESSAGE-ID REFERENCES IN-REPLY-TO)]'
+        ]
+        if use_gmail_threads:
+            fetch_keys.append('X-GM-THRID')
+
+        cache = self._thread_cache.setdefault(folder_name, OrderedDict())
+        if self._selected_modseq is not None:
+            self._refresh_changed_flags(folder_name)
+            known = []
+        else:
+            known = [uid for uid in uids if uid in cache]
+        missing = [uid for uid in uids if uid not in cache]
+
+        if missing:
+            try:
+                response = self._fetch_chunked(missing, fetch_keys)
+            except IMAPLib.Error as e:
+                if not use_gmail_threads or isinstance(e, _CONNECTION_ERRORS):
+                    raise
+                # Server rejected X-GM-THRID after all; thread by headers instead
+                logger.warning(f"X-GM-THRID fetch rejected for {self.email}, using header threading: {e}")
+                use_gmail_threads = False
+                fetch_keys.remove('X-GM-THRID')
+                response = self._fetch_chunked(missing, fetch_keys)
+            for uid, data in response.items():
+                cache[uid] = self._thread_record(uid, data, use_gmail_threads)
+
+        if known:
+            for uid, data in self._fetch_chunked(known, ['FLAGS']).items():
+                if uid in cache:
+                    cache[uid].flags = [f.decode() if isinstance(f, bytes) else f for f in data[b'FLAGS']]
+        return cache, fetch_keys
+
+    def _decode_addresses(self, roots: List[Dict], cache: "OrderedDict[int, _ThreadRecord]"):
+        """
+        Fill in sender/to/cc for the thread trees being returned. Decoding is
+        deferred to here so messages paginated away never pay for it; the
+        result is written back to the cached record so it happens once per UID.
+        Caller must NOT hold self._lock; it is taken for the write-back.
+        """
+        decoded = []
+        stack = list(roots)
+        while stack:
+            obj = stack.pop()
+            stack.extend(obj.get("children", []))
+            addrs = obj.pop("_addrs", None)
+            if addrs is None:
+                continue
+            from_, to, cc = addrs
+            obj["sender"] = self._format_address(from_)
+            obj["to"] = self._format_address(to)
+            obj["cc"] = self._format_address(cc)
+            decoded.append(obj)
+
+        if not decoded:
+            return
+        with self._lock:
+            for obj in decoded:
+                record = cache.get(obj["uid"])
+                if record is not None and record.addrs is not None:
+                    # Fill in before dropping addrs so readers never see neither
+                    record.sender, record.to, record.cc = obj["sender"], obj["to"], obj["cc"]
+                    record.addrs = None
+
+    def _search_message_ids(self, message_ids: List[str]) -> List[int]:
+        """
+        UIDs of the messages with any of the given Message-IDs, in one SEARCH.
+        The caller MUST hold self._lock (or otherwise own the session).
+        """
+        if not message_ids:
+            return []
+        # Prefix ORs: OR OR a b c matches any of a, b, c
+        criteria = ['OR'] * (len(message_ids) - 1)
+        for message_id in message_ids:
+            criteria += ['HEADER', 'Message-ID', message_id]
+        try:
+            return self.client.search(criteria)
+        except IMAPLib.Error as e:
+            if isinstance(e, _CONNECTION_ERRORS):
+                raise
+            logger.warning(f"Message-ID search failed for {self.email}: {e}")
+            return []
 
-    def _fetch_threads_fallback(self, folder_name: str, limit: int = 100, offset: int = 0) -> List[Dict]:
+    def _thread_record(self, uid: int, data: Dict, use_gmail_threads: bool) -> _ThreadRecord:
+        """
+        Build the per-message record _fetch_threads_fallback threads on from
+        one FETCH response item.
+        """
+        envelope = data[b'ENVELOPE']
+        flags = data[b'FLAGS']
+        internal_date = data.get(b'INTERNALDATE')
+
+        header_bytes = None
+        for key in data.keys():
+            if isinstance(key, bytes) and b'HEADER.FIELDS' in key:
+                header_bytes = data[key]
+                break
+
+        msg_id = ""
+        in_reply_to = ""
+        references = ()
+        parsed_date = None
+        if header_bytes:
+            hdr = _scan_headers(header_bytes)
+            # Interned: the same ids recur across References chains and are
+            # probed repeatedly against msgid_to_uid while linking
+            msg_id = sys.intern(hdr.get('message-id', ""))
+            in_reply_to = sys.intern(hdr.get('in-reply-to', ""))
+            refs = hdr.get('references', "")
+            if refs:
+                references = tuple(sys.intern(ref) for ref in refs.split())
+            # Parse Date header for timezone-aware datetime
+            date_str = hdr.get('date', '')
+            if date_str:
+                try:
+                    parsed_date = email.utils.parsedate_to_datetime(date_str)
+                except Exception:
+                    pass
+
+        # Gmail thread ID
+        gm_thrid = data.get(b'X-GM-THRID') if use_gmail_threads else None
+
+        return _ThreadRecord(
+            uid,
+            self._decode_str(envelope.subject),
+            # sender/to/cc are decoded by _decode_addresses only for messages that get returned
+            (envelope.from_, envelope.to, envelope.cc),
+            parsed_date or internal_date or envelope.date,
+            [f.decode() if isinstance(f, bytes) else f for f in flags],
+            msg_id,
+            in_reply_to,
+            references,
+            gm_thrid
+        )
+
+    def _fetch_threads_fallback(self, folder_name: str, limit: int = 100, offset: int = 0) -> Callable[[], List[Dict]]:
         """
         Fallback threading using three tiers:
         1. Gmail X-GM-THRID (native thread ID) when available
         2. In-Reply-To / References header linking
         3. Subject-based grouping for remaining orphans
+        Only the fetching happens here; the returned callable does the linking
+        and must be called without holding self._lock.
         NOTE: Caller (fetch_threads) already holds self._lock.
         """
         if not self.client:
             self._connect()
         if not self.client:
-            return []
+            return lambda: []
 
         try:
             self.select_folder(folder_name, readonly=True)
-            messages = self.client.search(['ALL'])
-            messages.sort(reverse=True)
+            messages = self._search_newest_first()
 
             if not messages:
-                return []
+                return lambda: []
+            # Thread a bounded window of the newest messages, not the whole folder
+            messages = messages[:max((offset + limit) * 10, self.THREAD_WINDOW)]
 
-            # Determine fetch keys based on server capabilities
-            use_gmail_threads = self._is_gmail()
-            fetch_keys = [
-                'ENVELOPE',
-                'FLAGS',
-                'INTERNALDATE',
-                'BODY.PEEK[HEADER.FIELDS (DATE MESSAGE-ID REFERENCES IN-REPLY-TO)]'
-            ]
-            if use_gmail_threads:
-                fetch_keys.append('X-GM-THRID')
-
-            # Fetch ALL emails for cross-page threading
-            response = self.client.fetch(messages, fetch_keys)
+            cache, fetch_keys = self._load_thread_records(folder_name, messages, self._is_gmail())
+            use_gmail_threads = 'X-GM-THRID' in fetch_keys
 
             email_map = {}
             msgid_to_uid = {}
+            for uid in reversed(messages): # Oldest first, as the server returns them
+                record = cache.get(uid)
+                if record is None:
+                    continue
+                cache.move_to_end(uid)
+                # The tiers below link and strip these dicts; keep the cached records intact
+                email_map[uid] = record.as_email()
+                if record.msg_id:
+                    msgid_to_uid[record.msg_id] = uid
+
+            if not use_gmail_threads:
+                # Replies whose parent is older than the window: find the parents by Message-ID
+                wanted = [
+                    r["_in_reply_to"] for r in email_map.values()
+                    if r["_in_reply_to"] and r["_in_reply_to"] not in msgid_to_uid
+                ]
+                parent_uids = [u for u in self._search_message_ids(wanted[:self.PARENT_LOOKUP_LIMIT]) if u not in email_map]
+                missing = [uid for uid in parent_uids if uid not in cache]
+                if missing:
+                    for uid, data in self._fetch_chunked(missing, fetch_keys).items():
+                        cache[uid] = self._thread_record(uid, data, False)
+                for uid in parent_uids:
+                    record = cache.get(uid)
+                    if record is not None:
+                        email_map[uid] = record.as_email()
+                        if record.msg_id:
+                            msgid_to_uid.setdefault(record.msg_id, uid)
+
+            while len(cache) > self.ENVELOPE_CACHE_SIZE:
+                cache.popitem(last=False)
+
+            return functools.partial(
+                self._link_fallback_threads, email_map, msgid_to_uid, use_gmail_threads, cache, limit, offset
+            )
+        except Exception as e:
+            logger.error(f"Fallback threading error for {folder_name}: {e}")
+            self._drop_if_disconnected(e)
+            # Still under fetch_threads' lock; the wrapped fetch_emails would re-acquire it
+            emails = self._fetch_emails_locked(folder_name, limit, offset)
+            return lambda: emails
+
+    def _link_fallback_threads(self, email_map: Dict[int, Dict], msgid_to_uid: Dict[str, int], use_gmail_threads: bool,
+                               cache: "OrderedDict[int, _ThreadRecord]", limit: int, offset: int) -> List[Dict]:
+        """
+        The linking tiers of _fetch_threads_fallback. Caller must NOT hold self._lock.
+        """
+        # === TIER 1: Gmail X-GM-THRID grouping ===
+        if use_gmail_threads:
+            thrid_groups = {}  # thrid -> [uid, uid, ...]
+            for uid, obj in email_map.items():
+                thrid = obj.get("_gm_thrid")
+                if thrid:
+                    thrid_groups.setdefault(thrid, []).append(uid)
 
-            for uid, data in response.items():
-                envelope = data[b'ENVELOPE']
-                flags = data[b'FLAGS']
-                internal_date = data.get(b'INTERNALDATE')
-
-                header_bytes = None
-                for key in data.keys():
-                    if isinstance(key, bytes) and b'HEADER.FIELDS' in key:
-                        header_bytes = data[key]
-                        break
-
-                msg_id = ""
-                in_reply_to = ""
-                references = []
-                parsed_date = None
-                if header_bytes:
-                    hdr_msg = email.message_from_bytes(header_bytes)
-                    msg_id = (hdr_msg.get('Message-ID') or "").strip()
-                    in_reply_to = (hdr_msg.get('In-Reply-To') or "").strip()
-                    refs = (hdr_msg.get('References') or "").strip()
-                    if refs:
-                        references = [r.strip() for r in refs.split() if r.strip()]
-                    # Parse Date header for timezone-aware datetime
-                    date_str = hdr_msg.get('Date', '')
-                    if date_str:
-                        try:
-                            parsed_date = email.utils.parsedate_to_datetime(date_str)
-                        except Exception:
-                            pass
-
-                # Gmail thread ID
-                gm_thrid = data.get(b'X-GM-THRID') if use_gmail_threads else None
-
-                email_map[uid] = {
-                    "uid": uid,
-                    "subject": self._decode_str(envelope.subject),
-                    "sender": self._format_address(envelope.from_),
-                    "to": self._format_address(envelope.to),
-                    "cc": self._format_address(envelope.cc),
-                    "date": parsed_date or internal_date or envelope.date,
-                    "flags": [f.decode() if isinstance(f, bytes) else f for f in flags],
-                    "children": [],
-                    "_msg_id": msg_id,
-                    "_in_reply_to": in_reply_to,
-                    "_references": references,
-                    "_gm_thrid": gm_thrid
-                }
-
-                if msg_id:
-                    msgid_to_uid[msg_id] = uid
-
-            # === TIER 1: Gmail X-GM-THRID grouping ===
-            if use_gmail_threads:
-                thrid_groups = {}  # thrid -> [uid, uid, ...]
-                for uid, obj in email_map.items():
-                    thrid = obj.get("_gm_thrid")
-                    if thrid:
-                        thrid_groups.setdefault(thrid, []).append(uid)
-
-                roots = []
-                used_uids = set()
-
-                for thrid, uids in thrid_groups.items():
-                    # Sort by date ascending so oldest is root
-                    uids.sort(key=lambda u: email_map[u].get("date") or 0)
-                    root_uid = uids[0]
-                    root_obj = email_map[root_uid]
-                    root_obj["children"] = []
-                    for child_uid in uids[1:]:
-                        child_obj = email_map[child_uid]
-                        child_obj["children"] = []
-                        root_obj["children"].append(child_obj)
-                    roots.append(root_obj)
-                    used_uids.update(uids)
-
-                # Add any emails without X-GM-THRID as standalone roots
-                for uid, obj in email_map.items():
-                    if uid not in used_uids:
-                        obj["children"] = []
-                        roots.append(obj)
-
-                # Sort roots by newest message date (considering children)
-                def thread_newest_date(root):
-                    dates = [root.get("date") or 0]
-                    for c in root.get("children", []):
-                        dates.append(c.get("date") or 0)
-                    return max(dates)
-
-                roots.sort(key=thread_newest_date, reverse=True)
-
-                # Clean internal fields
-                for obj in email_map.values():
-                    obj.pop("_msg_id", None)
-                    obj.pop("_in_reply_to", None)
-                    obj.pop("_references", None)
-                    obj.pop("_gm_thrid", None)
-
-                # Post-process: merge orphan roots by subject, then paginate
-                merged = self._merge_by_subject(roots)
-                return merged[offset:offset+limit]
-
-            # === TIER 2: In-Reply-To / References header linking ===
-            linked_uids = set()  # UIDs that got linked as children
             roots = []
-            for uid, email_obj in email_map.items():
-                parent_msgid = ""
-                if email_obj["_references"]:
-                    # Try all references, not just the last one
-                    for ref in reversed(email_obj["_references"]):
-                        if ref in msgid_to_uid and msgid_to_uid[ref] != uid:
-                            parent_msgid = ref
-                            break
-                if not parent_msgid and email_obj["_in_reply_to"]:
-                    parent_msgid = email_obj["_in_reply_to"]
-
-                parent_uid = msgid_to_uid.get(parent_msgid)
-                if parent_uid and parent_uid in email_map and parent_uid != uid:
-                    email_map[parent_uid]["children"].append(email_obj)
-                    linked_uids.add(uid)
-                else:
-                    roots.append(email_obj)
+            used_uids = set()
+
+            for thrid, uids in thrid_groups.items():
+                # Sort by date ascending so oldest is root
+                uids.sort(key=lambda u: email_map[u].get("date") or 0)
+                root_uid = uids[0]
+                root_obj = email_map[root_uid]
+                root_obj["children"] = []
+                for child_uid in uids[1:]:
+                    child_obj = email_map[child_uid]
+                    child_obj["children"] = []
+                    root_obj["children"].append(child_obj)
+                roots.append(root_obj)
+                used_uids.update(uids)
+
+            # Add any emails without X-GM-THRID as standalone roots
+            for uid, obj in email_map.items():
+                if uid not in used_uids:
+                    obj["children"] = []
+                    roots.append(obj)
+
+            # Sort roots by newest message date (considering children)
+            def thread_newest_date(root):
+                dates = [root.get("date") or 0]
+                for c in root.get("children", []):
+                    dates.append(c.get("date") or 0)
+                return max(dates)
+
+            roots.sort(key=thread_newest_date, reverse=True)
+
+            # Clean internal fields
+            for obj in email_map.values():
+                obj.pop("_msg_id", None)
+                obj.pop("_in_reply_to", None)
+                obj.pop("_references", None)
+                obj.pop("_gm_thrid", None)
+
+            # Post-process: merge orphan roots by subject, then paginate
+            merged = self._merge_by_subject(roots)
+            merged = merged[offset:offset+limit]
+            self._decode_addresses(merged, cache)
+            return merged
+
+        # === TIER 2: In-Reply-To / References header linking ===
+        roots = []
+        uid_for_msgid = msgid_to_uid.get
+        for uid, email_obj in email_map.items():
+            # Try all references, not just the last one; one dict probe per reference
+            parent_uid = None
+            for ref in reversed(email_obj["_references"]):
+                ref_uid = uid_for_msgid(ref)
+                if ref_uid is not None and ref_uid != uid:
+                    parent_uid = ref_uid
+                    break
+            if parent_uid is None and email_obj["_in_reply_to"]:
+                parent_uid = uid_for_msgid(email_obj["_in_reply_to"])
+
+            if parent_uid and parent_uid in email_map and parent_uid != uid:
+                email_map[parent_uid]["children"].append(email_obj)
+            else:
+                roots.append(email_obj)
 
-            # === TIER 3: Subject-based grouping for remaining orphan roots ===
-            final_roots = self._merge_by_subject(roots)
+        # === TIER 3: Subject-based grouping for remaining orphan roots ===
+        final_roots = self._merge_by_subject(roots)
 
-            # Remove internal fields before returning
-            for email_obj in email_map.values():
-                email_obj.pop("_msg_id", None)
-                email_obj.pop("_in_reply_to", None)
-                email_obj.pop("_references", None)
-                email_obj.pop("_gm_thrid", None)
+        # Remove internal fields before returning
+        for email_obj in email_map.values():
+            email_obj.pop("_msg_id", None)
+            email_obj.pop("_in_reply_to", None)
+            email_obj.pop("_references", None)
+            email_obj.pop("_gm_thrid", None)
 
-            return final_roots[offset:offset+limit]
-        except Exception as e:
-            logger.error(f"Fallback threading error for {folder_name}: {e}")
-            return self.fetch_emails(folder_name, limit, offset)
+        final_roots = final_roots[offset:offset+limit]
+        self._decode_addresses(final_roots, cache)
+        return final_roots
+
+    def _forget_envelopes(self, folder_name: Optional[str], uids: List[int]):
+        """
+        Drop cached threading records for UIDs that were moved or had their flags changed.
+        """
+        cache = self._thread_cache.get(folder_name)
+        if cache:
+            for uid in uids:
+                cache.pop(uid, None)
+
+    def _forget_folder(self, folder_name: str):
+        """
+        Drop everything cached for a folder, e.g. after its UIDVALIDITY changed.
+        """
+        self._thread_cache.pop(folder_name, None)
+        self._last_modseq.pop(folder_name, None)
 
+    @_reconnect_once
     def fetch_email_body(self, folder_name: str, uid: int) -> Dict[str, Any]:
         """
         Fetch the body of a specific email.
+        Multipart messages are fetched part by part from their BODYSTRUCTURE,
+        so attachments aren't downloaded until fetch_attachment asks for them.
         Uses lock to prevent concurrent folder re-selection.
         """
         if not self.client:
@@ -555,9 +1152,17 @@ class IMAPClient:
             return {}
 
         with self._lock:
+          cached = self._cached_body(folder_name, uid)
+          if cached is not None:
+              return cached
           try:
             self.select_folder(folder_name, readonly=True)
             logger.debug(f"Fetching body for UID {uid} in folder '{folder_name}'")
+            body = self._fetch_body_parts(folder_name, uid)
+            if body is not None:
+                self._remember_body(folder_name, uid, body)
+                return dict(body)
+
             response = self.client.fetch([uid], ['BODY.PEEK[]'])
             
             if uid not in response:
@@ -569,118 +1174,407 @@ class IMAPClient:
                 logger.warning(f"No BODY[] data for UID {uid} in folder '{folder_name}'")
                 return {}
             
-            raw_email = raw_data[b'BODY[]']
-            
-            msg = email.message_from_bytes(raw_email)
-            body_text = ""
-            body_html = ""
-            attachments = []
-            headers = {
-                "From": msg.get("From", ""),
-                "To": msg.get("To", ""),
-                "Cc": msg.get("Cc", ""),
-                "Subject": self._decode_str(msg.get("Subject", "")),
-                "Date": msg.get("Date", ""),
-                "Message-ID": msg.get("Message-ID", ""),
-                "References": msg.get("References", ""),
-                "In-Reply-To": msg.get("In-Reply-To", "")
-            }
-
-            if msg.is_multipart():
-                for part in msg.walk():
-                    content_type = part.get_content_type()
-                    content_disposition = str(part.get("Content-Disposition"))
-                    filename = part.get_filename()
-
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        if "attachment" in content_disposition or filename:
-                            attachments.append({
-                                "filename": filename or "attachment",
-                                "content_type": content_type,
-                                "data": payload
-                            })
-                        else:
-                            decoded = payload.decode(part.get_content_charset() or 'utf-8', errors='replace')
-                            if content_type == "text/plain":
-                                body_text += decoded
-                            elif content_type == "text/html":
-                                body_html += decoded
-            else:
-                payload = msg.get_payload(decode=True)
-                decoded = payload.decode(msg.get_content_charset() or 'utf-8', errors='replace')
-                if msg.get_content_type() == "text/html":
-                    body_html = decoded
-                else:
-                    body_text = decoded
-            
-            return {
-                "text": body_text,
-                "html": body_html,
-                "headers": headers,
-                "attachments": attachments
-            }
+            body = self._parse_message(raw_data[b'BODY[]'])
+            self._remember_body(folder_name, uid, body)
+            return dict(body)
 
           except Exception as e:
             logger.error(f"Error fetching body for UID {uid} in folder '{folder_name}': {e}")
+            self._drop_if_disconnected(e)
             return {}
 
-    def _decode_str(self, header_val):
-        if not header_val:
-            return ""
-        if isinstance(header_val, bytes):
-            return header_val.decode('utf-8', errors='replace')
-        
-        decoded_list = decode_header(str(header_val))
-        result = ""
-        for token, charset in decoded_list:
-            if isinstance(token, bytes):
-                if charset:
-                    result += token.decode(charset, errors='replace')
-                else:
-                    result += token.decode('utf-8', errors='replace')
+    def _fetch_body_parts(self, folder_name: str, uid: int) -> Optional[Dict[str, Any]]:
+        """
+        Build the fetch_email_body result from the header plus only the text
+        parts named by BODYSTRUCTURE. Returns None when the message should be
+        fetched whole instead (single part, nested message/rfc822, ...).
+        The caller MUST hold self._lock and have selected folder_name.
+        """
+        response = self.client.fetch([uid], ['BODYSTRUCTURE'])
+        bodystructure = response.get(uid, {}).get(b'BODYSTRUCTURE')
+        plan = self._plan_body_parts(bodystructure) if bodystructure else None
+        if plan is None:
+            return None
+        text_parts, attachments = plan
+
+        data = self.client.fetch([uid], self._body_part_keys(text_parts)).get(uid)
+        if not data:
+            return None
+        return self._body_from_parts(text_parts, attachments, data)
+
+    @staticmethod
+    def _body_part_keys(text_parts: List[Tuple[str, str, str, str]]) -> List[str]:
+        """FETCH items for the header plus the text parts planned by _plan_body_parts."""
+        return ['BODY.PEEK[HEADER]'] + [f'BODY.PEEK[{part[0]}]' for part in text_parts]
+
+    def _body_from_parts(self, text_parts: List[Tuple[str, str, str, str]], attachments: List[Dict[str, Any]],
+                         data: Dict) -> Dict[str, Any]:
+        """
+        The fetch_email_body result from a FETCH of _body_part_keys(text_parts).
+        """
+        text: List[str] = []
+        html: List[str] = []
+        for section, subtype, encoding, charset in text_parts:
+            raw = _decode_transfer_encoding(data.get(f'BODY[{section}]'.encode()) or b"", encoding)
+            try:
+                decoded = raw.decode(charset, errors='replace')
+            except LookupError:
+                decoded = raw.decode('utf-8', errors='replace')
+            (html if subtype == "html" else text).append(decoded)
+
+        return {
+            "text": "".join(text),
+            "html": "".join(html),
+            "headers": self._message_headers(_HDR_PARSER.parsebytes(data.get(b'BODY[HEADER]') or b"")),
+            "attachments": attachments
+        }
+
+    def _plan_body_parts(self, bodystructure) -> Optional[Tuple[List[Tuple[str, str, str, str]], List[Dict[str, Any]]]]:
+        """
+        Sort the leaf parts of a multipart BODYSTRUCTURE the way _parse_message
+        sorts MIME parts: returns ([(section, subtype, encoding, charset)] for
+        the text/plain and text/html body parts, [attachment dicts]).
+        None if the structure needs the full parser.
+        """
+        if not bodystructure.is_multipart:
+            return None
+        text_parts = []
+        attachments = []
+        stack = [(bodystructure, "")]
+        while stack:
+            node, section = stack.pop()
+            if node.is_multipart:
+                children = node[0]
+                prefix = f"{section}." if section else ""
+                # Reversed so parts are visited in document order
+                for i in range(len(children) - 1, -1, -1):
+                    stack.append((children[i], f"{prefix}{i + 1}"))
+                continue
+
+            maintype = _decode_fast(node[0]).lower()
+            subtype = _decode_fast(node[1]).lower()
+            if maintype == "message" and subtype == "rfc822":
+                return None
+            params = self._structure_params(node[2])
+            # Extension data: text parts carry a line count before MD5 and disposition
+            disposition_index = 9 if maintype == "text" else 8
+            disposition = node[disposition_index] if len(node) > disposition_index else None
+            disposition_type = ""
+            disposition_params = {}
+            if isinstance(disposition, (list, tuple)) and disposition:
+                disposition_type = _decode_fast(disposition[0]).lower()
+                disposition_params = self._structure_params(disposition[1] if len(disposition) > 1 else None)
+            if any("*0" in key for key in (*params, *disposition_params)):
+                # RFC 2231 continuations; leave those to the email package
+                return None
+
+            encoding = _decode_fast(node[5])
+            size = node[6] or 0
+            if not size:
+                continue
+            filename = self._structure_filename(disposition_params, "filename") or self._structure_filename(params, "name")
+            if disposition_type == "attachment" or filename:
+                attachments.append({
+                    "filename": filename or "attachment",
+                    "content_type": f"{maintype}/{subtype}",
+                    # BODYSTRUCTURE counts encoded octets
+                    "size": size * 3 // 4 if encoding.lower() == "base64" else size,
+                    "section": section,
+                    "encoding": encoding
+                })
+            elif maintype == "text" and subtype in ("plain", "html"):
+                charset = _decode_fast(params.get("charset")).lower() or "utf-8"
+                text_parts.append((section, subtype, encoding.lower(), charset))
+        return text_parts, attachments
+
+    @staticmethod
+    def _structure_params(raw) -> Dict[str, Any]:
+        """BODYSTRUCTURE parameter list (key, value, key, value...) as a dict with lower-cased keys."""
+        params = {}
+        if isinstance(raw, (list, tuple)):
+            for i in range(0, len(raw) - 1, 2):
+                params[_decode_fast(raw[i]).lower()] = raw[i + 1]
+        return params
+
+    def _structure_filename(self, params: Dict[str, Any], key: str) -> str:
+        if params.get(key):
+            return self._decode_str(params[key])
+        if params.get(f"{key}*"):
+            # RFC 2231: charset'language'percent-encoded
+            return email.utils.collapse_rfc2231_value(email.utils.decode_rfc2231(_decode_fast(params[f"{key}*"])))
+        return ""
+
+    @_reconnect_once
+    def fetch_email_bodies(self, folder_name: str, uids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Fetch and parse the bodies of several emails with one FETCH per
+        sequence-set chunk instead of one round-trip per UID.
+        Returns {uid: body_dict} in the same shape as fetch_email_body.
+        Bodies already cached are not fetched again, so this doubles as a prefetch.
+        Only header and text parts are downloaded; messages the part-by-part path
+        can't handle are skipped and left for fetch_email_body.
+        """
+        if not self.client:
+            self._connect()
+            
+        if not self.client:
+            return {}
+
+        bodies = {}
+        with self._lock:
+          for uid in uids:
+              cached = self._cached_body(folder_name, uid)
+              if cached is not None:
+                  bodies[uid] = cached
+          missing = [uid for uid in uids if uid not in bodies]
+          if not missing:
+              return bodies
+          try:
+            self.select_folder(folder_name, readonly=True)
+            # Plan from BODYSTRUCTURE as fetch_email_body does, so prefetching never
+            # downloads attachments; messages with the same part layout share a FETCH
+            plans = {}
+            groups: Dict[Tuple[str, ...], List[int]] = {}
+            whole = []
+            for uid, data in self._fetch_chunked(missing, ['BODYSTRUCTURE']).items():
+                bodystructure = data.get(b'BODYSTRUCTURE')
+                if bodystructure is None:
+                    continue
+                plan = self._plan_body_parts(bodystructure)
+                if plan is not None:
+                    plans[uid] = plan
+                    groups.setdefault(tuple(self._body_part_keys(plan[0])), []).append(uid)
+                elif not bodystructure.is_multipart and _decode_fast(bodystructure[0]).lower() == "text":
+                    whole.append(uid)
+                # Anything else (a lone attachment, nested messages) is fetched when opened
+            parts = {}
+            for keys, group in groups.items():
+                parts.update(self._fetch_chunked(group, list(keys)))
+            response = self._fetch_chunked(whole, ['BODY.PEEK[]']) if whole else {}
+          except Exception as e:
+            logger.error(f"Error fetching bodies for {len(missing)} UIDs in folder '{folder_name}': {e}")
+            self._drop_if_disconnected(e)
+            return bodies
+
+        # Parse outside the lock so other commands can use the session meanwhile
+        parsed = {}
+        for uid, (text_parts, attachments) in plans.items():
+            if uid in parts:
+                parsed[uid] = self._body_from_parts(text_parts, attachments, parts[uid])
+        for uid, raw_data in response.items():
+            if b'BODY[]' in raw_data:
+                try:
+                    parsed[uid] = self._parse_message(raw_data[b'BODY[]'])
+                except Exception as e:
+                    logger.error(f"Error parsing body for UID {uid} in folder '{folder_name}': {e}")
+        with self._lock:
+            for uid, body in parsed.items():
+                self._remember_body(folder_name, uid, body)
+        bodies.update((uid, dict(body)) for uid, body in parsed.items())
+        return bodies
+
+    def _cached_body(self, folder_name: str, uid: int) -> Optional[Dict[str, Any]]:
+        """
+        A copy of the cached body for the message, if any. Caller must hold self._lock.
+        """
+        body = self._body_cache.get((folder_name, uid))
+        if body is None:
+            return None
+        self._body_cache.move_to_end((folder_name, uid))
+        return dict(body)
+
+    def _remember_body(self, folder_name: str, uid: int, body: Dict[str, Any]):
+        """
+        Cache a parsed body; a UID's content never changes. Caller must hold self._lock.
+        """
+        self._body_cache[(folder_name, uid)] = body
+        while len(self._body_cache) > self.BODY_CACHE_SIZE:
+            self._body_cache.popitem(last=False)
+
+    @staticmethod
+    def _iter_leaf_parts(msg):
+        """
+        Yield (section, part) for each non-container MIME part in document
+        order, numbered the way IMAP BODY[section] addresses them.
+        """
+        stack = [(msg, "")]
+        while stack:
+            part, section = stack.pop()
+            if not part.is_multipart():
+                yield section or "1", part
+                continue
+            children = part.get_payload()
+            prefix = f"{section}." if section else ""
+            if part.get_content_maintype() == "message":
+                # Encapsulated message: a multipart body's parts sit directly
+                # under this section, a single-part body is section.1
+                inner = children[0]
+                if not inner.is_multipart():
+                    stack.append((inner, f"{prefix}1"))
+                    continue
+                children = inner.get_payload()
+            # Reversed so parts come off the stack in document order
+            for i in range(len(children) - 1, -1, -1):
+                stack.append((children[i], f"{prefix}{i + 1}"))
+
+    @_reconnect_once
+    def fetch_attachment(self, folder_name: str, uid: int, section: str, encoding: str = "") -> bytes:
+        """
+        Download one attachment part (as listed by fetch_email_body) and undo its transfer encoding.
+        """
+        if not self.client:
+            self._connect()
+            
+        if not self.client:
+            return b""
+
+        with self._lock:
+          try:
+            self.select_folder(folder_name, readonly=True)
+            response = self.client.fetch([uid], [f'BODY.PEEK[{section}]'])
+            raw = response.get(uid, {}).get(f'BODY[{section}]'.encode(), b"") or b""
+          except Exception as e:
+            logger.error(f"Error fetching attachment {section} of UID {uid} in folder '{folder_name}': {e}")
+            self._drop_if_disconnected(e)
+            return b""
+
+        return _decode_transfer_encoding(raw, encoding)
+
+    def _parse_message(self, raw_email: bytes) -> Dict[str, Any]:
+        """
+        Split a raw RFC 822 message into text, html, headers and attachments.
+        """
+        msg = _MSG_PARSER.parsebytes(raw_email)
+        text_parts: List[str] = []
+        html_parts: List[str] = []
+        attachments = []
+        headers = self._message_headers(msg)
+
+        if msg.is_multipart():
+            for section, part in self._iter_leaf_parts(msg):
+                content_type = part.get_content_type()
+                content_disposition = str(part.get("Content-Disposition"))
+                filename = part.get_filename()
+
+                if "attachment" in content_disposition or filename:
+                    # Bytes are fetched on demand via fetch_attachment(section), so
+                    # don't decode them here just to measure them; size the encoded
+                    # part the way the BODYSTRUCTURE path does
+                    encoding = part.get("Content-Transfer-Encoding", "")
+                    size = len(part.get_payload() or "")
+                    if size:
+                        attachments.append({
+                            "filename": filename or "attachment",
+                            "content_type": content_type,
+                            "size": size * 3 // 4 if encoding.strip().lower() == "base64" else size,
+                            "section": section,
+                            "encoding": encoding
+                        })
+                    continue
+
+                payload = part.get_payload(decode=True)
+                if payload:
+                    decoded = payload.decode(part.get_content_charset() or 'utf-8', errors='replace')
+                    if content_type == "text/plain":
+                        text_parts.append(decoded)
+                    elif content_type == "text/html":
+                        html_parts.append(decoded)
+        else:
+            payload = msg.get_payload(decode=True)
+            decoded = payload.decode(msg.get_content_charset() or 'utf-8', errors='replace')
+            if msg.get_content_type() == "text/html":
+                html_parts.append(decoded)
             else:
-                result += str(token)
-        return result
+                text_parts.append(decoded)
+
+        body_text = "".join(text_parts)
+        body_html = "".join(html_parts)
+        
+        return {
+            "text": body_text,
+            "html": body_html,
+            "headers": headers,
+            "attachments": attachments
+        }
+
+    def _message_headers(self, msg) -> Dict[str, str]:
+        """The headers the viewer and reply/forward use, from a parsed message or header block."""
+        return {
+            "From": msg.get("From", ""),
+            "To": msg.get("To", ""),
+            "Cc": msg.get("Cc", ""),
+            "Subject": self._decode_str(msg.get("Subject", "")),
+            "Date": msg.get("Date", ""),
+            "Message-ID": msg.get("Message-ID", ""),
+            "References": msg.get("References", ""),
+            "In-Reply-To": msg.get("In-Reply-To", "")
+        }
+
+    def _decode_str(self, header_val):
+        return _decode_value(header_val)
 
     def _format_address(self, addresses):
         if not addresses:
             return ""
         # addresses is a tuple of (name, route, mailbox, host)
-        # simplistic implementation
-        result = []
-        for addr in addresses:
-            name = self._decode_str(addr.name) if addr.name else ""
-            email_addr = f"{self._decode_str(addr.mailbox)}@{self._decode_str(addr.host)}"
-            if name:
-                result.append(f"{name} <{email_addr}>")
-            else:
-                result.append(email_addr)
-        return ", ".join(result)
+        if len(addresses) == 1:
+            # Most From/To fields hold a single address; skip the list and join
+            addr = addresses[0]
+            return _format_one_address(addr.name, addr.mailbox, addr.host)
+        return ", ".join(_format_one_address(addr.name, addr.mailbox, addr.host) for addr in addresses)
 
-    def move_emails(self, uids: List[int], target_folder: str) -> bool:
+    def move_emails(self, uids: List[int], target_folder: str, source_folder: Optional[str] = None) -> bool:
         """
-        Move emails to another folder.
+        Move emails from source_folder to another folder.
         """
+        if self.has_move():
+            # Repeating UID MOVE for messages already moved is a no-op, so a dropped session can be retried
+            return self._move_emails_retrying(uids, target_folder, source_folder)
+        # The COPY fallback isn't idempotent: retrying after it landed would duplicate the messages
+        return self._move_emails(uids, target_folder, source_folder)
+
+    def _move_emails(self, uids: List[int], target_folder: str, source_folder: Optional[str]) -> bool:
         if not self.client:
             self._connect()
         if not self.client:
             return False
 
         with self._lock:
+          if not self._select_for_update(source_folder):
+              return False
           try:
-            # imapclient's move method handles copy + delete + expunge usually, 
-            # or uses MOVE extension if available.
+            # One UID command per sequence-set chunk rather than a UID list
+            source_folder = self._selected_folder
             self._selected_folder = None  # folder state changes after move
-            self.client.move(uids, target_folder)
+            chunks = _uids_to_sequence_set(uids)
+            if self.has_move():
+                for seq_set in chunks:
+                    self.client.move(seq_set, target_folder)
+            else:
+                # No MOVE (RFC 6851): COPY + STORE \Deleted + EXPUNGE.
+                # UIDPLUS lets us expunge just these UIDs; otherwise the whole
+                # folder's \Deleted messages go, as with a classic move.
+                for seq_set in chunks:
+                    self.client.copy(seq_set, target_folder)
+                    self.client.delete_messages(seq_set, silent=True)
+                    if self.has_uidplus():
+                        self.client.uid_expunge(seq_set)
+                if not self.has_uidplus():
+                    self.client.expunge()
+            self._forget_envelopes(source_folder, uids)
             return True
           except Exception as e:
             logger.error(f"Error moving emails to {target_folder}: {e}")
+            self._drop_if_disconnected(e)
             return False
 
-    def copy_emails(self, uids: List[int], target_folder: str) -> bool:
+    _move_emails_retrying = _reconnect_once(_move_emails)
+
+    def copy_emails(self, uids: List[int], target_folder: str, source_folder: Optional[str] = None) -> bool:
         """
-        Copy emails to another folder.
+        Copy emails from source_folder to another folder.
+        Not retried on a dropped session: COPY may have landed before the
+        connection went, and repeating it would duplicate the messages.
         """
         if not self.client:
             self._connect()
@@ -688,16 +1582,21 @@ class IMAPClient:
             return False
 
         with self._lock:
+          if not self._select_for_update(source_folder):
+              return False
           try:
-            self.client.copy(uids, target_folder)
+            for seq_set in _uids_to_sequence_set(uids):
+                self.client.copy(seq_set, target_folder)
             return True
           except Exception as e:
             logger.error(f"Error copying emails to {target_folder}: {e}")
+            self._drop_if_disconnected(e)
             return False
 
-    def add_flags(self, uids: List[int], flags: List[str]) -> bool:
+    @_reconnect_once
+    def add_flags(self, uids: List[int], flags: List[str], source_folder: Optional[str] = None) -> bool:
         r"""
-        Add flags to emails (e.g. \Seen).
+        Add flags to emails in source_folder (e.g. \Seen).
         """
         if not self.client:
             self._connect()
@@ -705,16 +1604,22 @@ class IMAPClient:
             return False
             
         with self._lock:
+          if not self._select_for_update(source_folder):
+              return False
           try:
-            self.client.add_flags(uids, flags)
+            for seq_set in _uids_to_sequence_set(uids):
+                self.client.add_flags(seq_set, flags, silent=True)
+            self._forget_envelopes(self._selected_folder, uids)
             return True
           except Exception as e:
             logger.error(f"Error adding flags {flags}: {e}")
+            self._drop_if_disconnected(e)
             return False
 
-    def remove_flags(self, uids: List[int], flags: List[str]) -> bool:
+    @_reconnect_once
+    def remove_flags(self, uids: List[int], flags: List[str], source_folder: Optional[str] = None) -> bool:
         """
-        Remove flags from emails.
+        Remove flags from emails in source_folder.
         """
         if not self.client:
             self._connect()
@@ -722,11 +1627,16 @@ class IMAPClient:
             return False
             
         with self._lock:
+          if not self._select_for_update(source_folder):
+              return False
           try:
-            self.client.remove_flags(uids, flags)
+            for seq_set in _uids_to_sequence_set(uids):
+                self.client.remove_flags(seq_set, flags, silent=True)
+            self._forget_envelopes(self._selected_folder, uids)
             return True
           except Exception as e:
             logger.error(f"Error removing flags {flags}: {e}")
+            self._drop_if_disconnected(e)
             return False
 
     def logout(self):
@@ -0,0 +1,157 @@
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from ..core.imap_client import IMAPClient
+
+logger = logging.getLogger(__name__)
+
+class IMAPConnectionPool:
+    """
+    Process-wide cache of logged-in IMAPClient sessions, keyed by account email
+    and purpose. Reusing a session avoids a TLS handshake + LOGIN on every poll
+    and UI call. Callers share the returned client and must hold client._lock
+    around multi-step work (select + search/fetch) on it.
+
+    Each account gets a "meta" session for folder lists, envelopes and flags,
+    and, on first use, a "bulk" session for message bodies and attachments,
+    so a large download doesn't hold up the rest of the UI.
+    """
+    # Servers commonly drop idle sessions after ~30 minutes; probe before that.
+    IDLE_CHECK_SECONDS = 25 * 60
+    # Background NOOP for sessions idle this long, so they survive between uses
+    KEEPALIVE_SECONDS = 5 * 60
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, str], Tuple[IMAPClient, float]] = {}  # {(email, purpose): (client, last_used)}
+        self._lock = threading.Lock()
+        self._keepalive_timer = None
+
+    def get(self, account_email: str, purpose: str = "meta") -> IMAPClient:
+        """
+        Return a connected client for the account, reconnecting if the cached one went stale.
+        purpose is "meta" (default) or "bulk" for body and attachment downloads.
+        """
+        key = (account_email, purpose)
+        with self._lock:
+            entry = self._clients.get(key)
+
+        if entry:
+            client, last_used = entry
+            if self._is_alive(client, last_used):
+                with self._lock:
+                    self._clients[key] = (client, time.monotonic())
+                return client
+            logger.info(f"Dropping stale {purpose} IMAP session for {account_email}")
+            self.discard(account_email, purpose)
+
+        # Connect outside the pool lock so one slow login doesn't block other accounts
+        return self._store(key, IMAPClient(account_email))
+
+    def connect_all(self, account_emails: List[str]):
+        """
+        Log in every account that has no cached session yet, in parallel.
+        """
+        with self._lock:
+            missing = [e for e in account_emails if (e, "meta") not in self._clients]
+        for client in IMAPClient.connect_all(missing):
+            if client.client:
+                self._store((client.email, "meta"), client)
+
+    def _store(self, key: Tuple[str, str], client: IMAPClient) -> IMAPClient:
+        duplicate = None
+        with self._lock:
+            existing = self._clients.get(key)
+            if existing and existing[0].client:
+                # Another thread connected first; keep theirs
+                duplicate = client
+                client = existing[0]
+            self._clients[key] = (client, time.monotonic())
+            self._schedule_keepalive()
+        if duplicate:
+            # LOGOUT is a network round trip; don't hold up other accounts on it
+            duplicate.logout()
+        return client
+
+    def _schedule_keepalive(self):
+        """
+        Arm the keep-alive timer if it isn't running. Caller must hold self._lock.
+        """
+        if self._keepalive_timer is None and self._clients:
+            self._keepalive_timer = threading.Timer(self.KEEPALIVE_SECONDS, self._keepalive)
+            self._keepalive_timer.daemon = True
+            self._keepalive_timer.start()
+
+    def _keepalive(self):
+        """
+        Send NOOP on idle sessions and drop the ones that no longer answer.
+        """
+        with self._lock:
+            self._keepalive_timer = None
+            entries = list(self._clients.items())
+
+        now = time.monotonic()
+        for key, (client, last_used) in entries:
+            if not client.client or now - last_used < self.KEEPALIVE_SECONDS:
+                continue
+            # A session busy with a command is evidently alive; don't wait on it
+            if not client._lock.acquire(blocking=False):
+                continue
+            try:
+                client.client.noop()
+                alive = True
+            except Exception as e:
+                logger.warning(f"IMAP keep-alive failed for {key[0]} ({key[1]}): {e}")
+                alive = False
+            finally:
+                client._lock.release()
+
+            if alive:
+                with self._lock:
+                    if self._clients.get(key, (None,))[0] is client:
+                        self._clients[key] = (client, time.monotonic())
+            else:
+                self.discard(*key)
+
+        with self._lock:
+            self._schedule_keepalive()
+
+    def _is_alive(self, client: IMAPClient, last_used: float) -> bool:
+        if not client.client:
+            return False
+        if time.monotonic() - last_used < self.IDLE_CHECK_SECONDS:
+            return True
+        try:
+            with client._lock:
+                client.client.noop()
+            return True
+        except Exception as e:
+            logger.warning(f"IMAP keep-alive failed for {client.email}: {e}")
+            return False
+
+    def discard(self, account_email: str, purpose: Optional[str] = None):
+        """
+        Forget and log out the cached sessions for an account (e.g. after an error or account change).
+        Only the session for purpose is dropped when given, otherwise all of them.
+        """
+        with self._lock:
+            keys = [k for k in self._clients if k[0] == account_email and purpose in (None, k[1])]
+            entries = [self._clients.pop(k) for k in keys]
+        for client, _ in entries:
+            # Wait for any in-flight command on the shared session before closing it
+            with client._lock:
+                client.logout()
+
+    def close_all(self):
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+            if self._keepalive_timer:
+                self._keepalive_timer.cancel()
+                self._keepalive_timer = None
+        for client, _ in entries:
+            client.logout()
+
+# Global instance
+imap_pool = IMAPConnectionPool()
@@ -0,0 +1,22 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json reads and writes the same data
+    orjson = None
+
+def dumps(data: Any, pretty: bool = False) -> bytes:
+    """
+    Encode data as UTF-8 JSON, indented when pretty (for files people may edit).
+    """
+    if orjson:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None)
+        except TypeError:
+            # orjson is stricter (e.g. non-str keys); let stdlib json coerce
+            pass
+    return json.dumps(data, indent=4 if pretty else None).encode('utf-8')
+
+def loads(raw: Union[bytes, str]) -> Any:
+    return orjson.loads(raw) if orjson else json.loads(raw)
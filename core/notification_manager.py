@@ -1,26 +1,27 @@
 
 import logging
+import queue
 import threading
+import time
 import winsound
 from windows_toasts import Toast, WindowsToaster
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, Tuple
 from .configuration import config
 
 logger = logging.getLogger(__name__)
 
 class NotificationManager:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(NotificationManager, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
-
-    def _initialize(self):
+    # The same sound requested again within this window is dropped
+    SOUND_DEBOUNCE_SECONDS = 0.15
+
+    def __init__(self):
         self.toaster = WindowsToaster('Accessible Email Client')
         self.silent_mode = False
-        self.prefs = self._load_prefs()
+        self._apply_prefs(self._load_prefs())
+        # One long-lived player instead of a thread per sound
+        self._sound_queue: "queue.Queue[str]" = queue.Queue(maxsize=4)
+        self._sound_worker: Optional[threading.Thread] = None
+        self._last_sound = (None, 0.0)  # (sound, monotonic time it was queued)
 
     def _default_prefs(self) -> Dict[str, Any]:
         return {
@@ -40,6 +41,25 @@ class NotificationManager:
         base["accounts"] = prefs.get("accounts") or {}
         return base
 
+    def _apply_prefs(self, prefs: Dict[str, Any]):
+        """
+        Store prefs and build lower-cased lookup tables for _resolve_sound from them.
+        """
+        self.prefs = prefs
+
+        def lowered(mapping) -> Dict[str, str]:
+            return {str(k).lower(): v for k, v in mapping.items()} if isinstance(mapping, dict) else {}
+
+        self._default_sound = prefs.get("default") or "SystemAsterisk"
+        self._sender_sounds = lowered(prefs.get("senders"))
+        self._folder_sounds = lowered(prefs.get("folders"))
+        # {account: (senders, folders, default or None)}
+        self._account_resolvers: Dict[str, Tuple[Dict[str, str], Dict[str, str], Optional[str]]] = {
+            str(account).lower(): (lowered(acc.get("senders")), lowered(acc.get("folders")), acc.get("default"))
+            for account, acc in prefs.get("accounts", {}).items()
+            if isinstance(acc, dict)
+        }
+
     def _load_prefs(self) -> Dict[str, Any]:
         prefs = config.get("notification_prefs", {})
         return self._normalize_prefs(prefs)
@@ -51,7 +71,7 @@ class NotificationManager:
         return self.prefs
 
     def set_preferences(self, prefs: Dict[str, Any]):
-        self.prefs = self._normalize_prefs(prefs)
+        self._apply_prefs(self._normalize_prefs(prefs))
         self._save_prefs()
 
     def set_silent_mode(self, enabled: bool):
@@ -83,40 +103,60 @@ class NotificationManager:
             return
 
         sound_to_play = self._resolve_sound(category, sender, account_email)
+        if not sound_to_play:
+            return
+
+        now = time.monotonic()
+        last_sound, last_at = self._last_sound
+        if sound_to_play == last_sound and now - last_at < self.SOUND_DEBOUNCE_SECONDS:
+            return  # a burst of mail plays its sound once
+        self._last_sound = (sound_to_play, now)
+
+        try:
+            # Played on the worker thread so it doesn't block UI
+            self._ensure_sound_worker()
+            self._sound_queue.put_nowait(sound_to_play)
+        except queue.Full:
+            pass  # enough sounds already waiting
+        except Exception as e:
+            logger.error(f"Failed to play sound: {e}")
+
+    def _ensure_sound_worker(self):
+        if self._sound_worker is None or not self._sound_worker.is_alive():
+            self._sound_worker = threading.Thread(target=self._sound_loop, name="NotificationSound", daemon=True)
+            self._sound_worker.start()
 
-        if sound_to_play:
-            try:
-                # Run in a separate thread so it doesn't block UI
-                threading.Thread(target=self._play_sound_thread, args=(sound_to_play,)).start()
-            except Exception as e:
-                logger.error(f"Failed to play sound: {e}")
+    def _sound_loop(self):
+        while True:
+            self._play_sound_now(self._sound_queue.get())
 
     def _resolve_sound(self, category: str, sender: Optional[str], account_email: Optional[str]) -> Optional[str]:
-        prefs = self.prefs or self._default_prefs()
-        sound = prefs.get("default") or "SystemAsterisk"
+        sound = self._default_sound
 
         sender_key = sender.lower() if sender else None
         category_key = category.lower() if category else None
 
         # Global overrides
         if sender_key:
-            sound = prefs.get("senders", {}).get(sender_key, sound)
+            sound = self._sender_sounds.get(sender_key, sound)
         if category_key:
-            sound = prefs.get("folders", {}).get(category_key, sound)
+            sound = self._folder_sounds.get(category_key, sound)
 
         # Account overrides
         if account_email:
-            acc_key = account_email.lower()
-            acc = prefs.get("accounts", {}).get(acc_key, {})
-            sound = acc.get("default", sound)
-            if sender_key:
-                sound = acc.get("senders", {}).get(sender_key, sound)
-            if category_key:
-                sound = acc.get("folders", {}).get(category_key, sound)
+            resolver = self._account_resolvers.get(account_email.lower())
+            if resolver:
+                senders, folders, default = resolver
+                if default is not None:
+                    sound = default
+                if sender_key:
+                    sound = senders.get(sender_key, sound)
+                if category_key:
+                    sound = folders.get(category_key, sound)
 
         return sound
 
-    def _play_sound_thread(self, sound):
+    def _play_sound_now(self, sound):
         try:
             # winsound.PlaySound supports system event aliases (like 'SystemAsterisk') or filenames
             flags = winsound.SND_ASYNC
@@ -129,4 +169,5 @@ class NotificationManager:
         except Exception as e:
             logger.error(f"Error playing sound '{sound}': {e}")
 
+# Global instance
 notification_manager = NotificationManager()
@@ -1,11 +1,27 @@
 
-import json
 import logging
-from typing import List, Dict, Any, Optional
-from ..database.db_manager import db_manager
+import re
+import threading
+from typing import List, Dict, Any, Optional, Pattern, Tuple
+from ..database.db_manager import db_manager, SQL_GET_ACTIVE_RULES
+from ..core import jsonutil
 
 logger = logging.getLogger(__name__)
 
+# Condition fields apply_rules knows how to match
+RULE_FIELDS = ("sender", "subject", "recipient")
+# Conditions with more terms than this are matched with one compiled regex instead of term by term
+RULE_REGEX_MIN_TERMS = 8
+
+# Shared by every RuleManager and cleared whenever a rule is added, changed or deleted:
+# account_id -> decoded rules, as get_rules returns them
+_RULES_CACHE: Dict[Optional[int], List[Dict[str, Any]]] = {}
+# account_id -> [(name, actions, ((field, terms, pattern), ...)), ...], lower-cased and split once;
+# pattern is None unless the condition has more than RULE_REGEX_MIN_TERMS terms
+_COMPILED_RULES: Dict[Optional[int], List[Tuple[str, Dict[str, Any], Tuple[Tuple[str, Tuple[str, ...], Optional[Pattern[str]]], ...]]]] = {}
+# Re-entrant: _compiled_rules fills _RULES_CACHE through get_rules while holding it
+_RULES_LOCK = threading.RLock()
+
 class RuleManager:
     """
     Manages smart folder rules, scoped per account.
@@ -19,9 +35,10 @@ class RuleManager:
         """
         try:
             query = "INSERT INTO rules (name, condition_json, action_json, account_id, is_active) VALUES (?, ?, ?, ?, 1)"
-            cond_json = json.dumps(conditions)
-            act_json = json.dumps(actions)
+            cond_json = jsonutil.dumps(conditions).decode('utf-8')
+            act_json = jsonutil.dumps(actions).decode('utf-8')
             self.db.execute_commit(query, (name, cond_json, act_json, account_id))
+            self._invalidate()
             return True
         except Exception as e:
             logger.error(f"Failed to add rule: {e}")
@@ -31,34 +48,42 @@ class RuleManager:
         """
         Get active rules, optionally filtered by account.
         If account_id is provided, returns rules for that account + any legacy global rules (account_id IS NULL).
+        Served from memory after the first call until a rule changes.
         """
+        with _RULES_LOCK:
+            cached = _RULES_CACHE.get(account_id)
+            if cached is None:
+                cached = self._load_rules(account_id)
+                if cached is None:
+                    return []
+                _RULES_CACHE[account_id] = cached
+        return list(cached)
+
+    def _load_rules(self, account_id: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        """Read and decode the rules from the database; None if that fails."""
         try:
-            if account_id is not None:
-                query = "SELECT id, name, condition_json, action_json, account_id FROM rules WHERE is_active = 1 AND (account_id = ? OR account_id IS NULL)"
-                rows = self.db.fetch_all(query, (account_id,))
-            else:
-                query = "SELECT id, name, condition_json, action_json, account_id FROM rules WHERE is_active = 1"
-                rows = self.db.fetch_all(query)
+            rows = self.db.fetch_all(SQL_GET_ACTIVE_RULES, (account_id, account_id))
             rules = []
             for row in rows:
                 rules.append({
                     "id": row["id"],
                     "name": row["name"],
-                    "conditions": json.loads(row["condition_json"]),
-                    "actions": json.loads(row["action_json"]),
+                    "conditions": jsonutil.loads(row["condition_json"]),
+                    "actions": jsonutil.loads(row["action_json"]),
                     "account_id": row["account_id"]
                 })
             return rules
         except Exception as e:
             logger.error(f"Failed to get rules: {e}")
-            return []
+            return None
 
     def update_rule(self, rule_id: int, name: str, conditions: Dict[str, str], actions: Dict[str, str], account_id: int = None) -> bool:
         try:
             query = "UPDATE rules SET name = ?, condition_json = ?, action_json = ?, account_id = ? WHERE id = ?"
-            cond_json = json.dumps(conditions)
-            act_json = json.dumps(actions)
+            cond_json = jsonutil.dumps(conditions).decode('utf-8')
+            act_json = jsonutil.dumps(actions).decode('utf-8')
             self.db.execute_commit(query, (name, cond_json, act_json, account_id, rule_id))
+            self._invalidate()
             return True
         except Exception as e:
             logger.error(f"Failed to update rule {rule_id}: {e}")
@@ -68,55 +93,99 @@ class RuleManager:
         try:
             query = "DELETE FROM rules WHERE id = ?"
             self.db.execute_commit(query, (rule_id,))
+            self._invalidate()
             return True
         except Exception as e:
             logger.error(f"Failed to delete rule {rule_id}: {e}")
             return False
 
+    def _invalidate(self):
+        with _RULES_LOCK:
+            _RULES_CACHE.clear()
+            _COMPILED_RULES.clear()
+
+    def _compiled_rules(self, account_id: Optional[int]):
+        """
+        The account's rules with each condition lower-cased and split into a
+        tuple of terms, built once and reused until the rules change.
+        """
+        with _RULES_LOCK:
+            compiled = _COMPILED_RULES.get(account_id)
+            if compiled is not None:
+                return compiled
+
+            compiled = []
+            for rule in self.get_rules(account_id=account_id):
+                conditions = []
+                for field, value in rule["conditions"].items():
+                    if field not in RULE_FIELDS:
+                        # Such a rule can never match; say so once instead of per email
+                        logger.warning(f"[RULES] Rule '{rule['name']}': unknown condition field '{field}'")
+                        break
+                    terms = tuple(t.strip() for t in value.lower().split(',') if t.strip())
+                    pattern = None
+                    if len(terms) > RULE_REGEX_MIN_TERMS:
+                        pattern = re.compile("|".join(map(re.escape, terms)))
+                    conditions.append((field, terms, pattern))
+                else:
+                    compiled.append((rule["name"], rule["actions"], tuple(conditions)))
+            _COMPILED_RULES[account_id] = compiled
+            return compiled
+
     def apply_rules(self, email_data: Dict[str, Any], account_id: int = None) -> Optional[Dict[str, Any]]:
         """
         Check if email matches any rule for the given account.
         Returns the action dict of the first matching rule, or None.
         """
-        rules = self.get_rules(account_id=account_id)
-        sender = email_data.get("sender", "").lower()
-        subject = email_data.get("subject", "").lower()
-        to = email_data.get("to", "").lower()
-        cc = email_data.get("cc", "").lower()
-        recipients = f"{to}, {cc}"  # Combined for matching
-
-        logger.debug(f"[RULES] Checking {len(rules)} rules against email: sender='{sender}', to='{to}', cc='{cc}', subject='{subject[:50]}'")
-
-        for rule in rules:
-            conditions = rule["conditions"]
-            match = True
-            
+        rules = self._compiled_rules(account_id)
+        if not rules:
+            # Common for new accounts; skip the per-email lower-casing and logging
+            return None
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(
+                "[RULES] Checking %d rules against email: sender='%s', to='%s', cc='%s', subject='%s'",
+                len(rules), email_data.get('sender', ''), email_data.get('to', ''),
+                email_data.get('cc', ''), (email_data.get('subject') or '')[:50]
+            )
+
+        # Lower-cased lazily: only the fields some rule actually looks at, once per email
+        texts: Dict[str, str] = {}
+        for name, actions, conditions in rules:
             # Check all conditions (AND logic)
-            for field, value in conditions.items():
-                value = value.lower()
-                target_values = [v.strip() for v in value.split(',') if v.strip()]
-                
-                if field == "sender":
-                    if not any(tv in sender for tv in target_values):
-                        match = False
-                        logger.debug(f"[RULES] Rule '{rule['name']}': sender mismatch. Looking for {target_values} in '{sender}'")
-                        break
-                elif field == "subject":
-                    if not any(tv in subject for tv in target_values):
-                        match = False
-                        break
-                elif field == "recipient":
-                    if not any(tv in recipients for tv in target_values):
-                        match = False
-                        logger.debug(f"[RULES] Rule '{rule['name']}': recipient mismatch. Looking for {target_values} in to='{to}' cc='{cc}'")
-                        break
-                else:
-                    logger.warning(f"[RULES] Unknown condition field: '{field}'")
-                    match = False
+            for field, terms, pattern in conditions:
+                text = texts.get(field)
+                if text is None:
+                    text = texts[field] = self._match_text(email_data, field)
+                # An empty field (e.g. no subject on a calendar notice) can't contain any term
+                if not (text and self._contains_any(text, terms, pattern)):
+                    if debug:
+                        logger.debug("[RULES] Rule '%s': %s mismatch. Looking for %s in '%s'", name, field, list(terms), text)
                     break
-            
-            if match:
-                logger.info(f"Email matched rule '{rule['name']}'")
-                return rule["actions"]
+            else:
+                logger.info(f"Email matched rule '{name}'")
+                return actions
         
         return None
+
+    @staticmethod
+    def _contains_any(text: str, terms: Tuple[str, ...], pattern: Optional[Pattern[str]]) -> bool:
+        if pattern is not None:
+            return pattern.search(text) is not None
+        # Plain loop rather than any(): no generator object per condition.
+        # str containment already runs the C fast search; encoding to bytes first measured slower.
+        for term in terms:
+            if term in text:
+                return True
+        return False
+
+    @staticmethod
+    def _match_text(email_data: Dict[str, Any], field: str) -> str:
+        """The lower-cased text a condition on field is matched against."""
+        if field == "recipient":
+            # To and Cc combined for matching
+            to, cc = email_data.get('to', ''), email_data.get('cc', '')
+            if not (to or cc):
+                return ""
+            return f"{to}, {cc}".lower()
+        return email_data.get(field, "").lower()
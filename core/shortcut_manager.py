@@ -1,7 +1,7 @@
 
 import wx
 import logging
-from typing import Dict, Tuple, Callable
+from typing import Dict, Tuple, Callable, Optional, FrozenSet, Set
 from .configuration import config
 
 logger = logging.getLogger(__name__)
@@ -14,6 +14,26 @@ class ShortcutManager:
         self.callbacks: Dict[str, Callable] = {}
         # Action ID -> current_accel_string
         self.current_shortcuts: Dict[str, str] = {}
+        # Accelerator string -> (flags, keycode), or None if wx can't parse it
+        self._parsed: Dict[str, Optional[Tuple[int, int]]] = {}
+        # (modifier flags, keycode) -> action IDs bound to that key; rebuilt when shortcuts change
+        self._dispatch: Dict[Tuple[int, int], FrozenSet[str]] = {}
+        # Action ID -> command ID used in the accelerator table, reused across rebuilds
+        self._wx_ids: Dict[str, wx.WindowIDRef] = {}
+
+    def _parse(self, shortcut_str: str) -> Optional[Tuple[int, int]]:
+        """
+        (flags, keycode) for an accelerator string such as "Ctrl+Shift+R".
+        Parsed by wx once per distinct string; key handlers call this on every key press.
+        """
+        try:
+            return self._parsed[shortcut_str]
+        except KeyError:
+            pass
+        entry = wx.AcceleratorEntry()
+        parsed = (entry.GetFlags(), entry.GetKeyCode()) if entry.FromString(shortcut_str) else None
+        self._parsed[shortcut_str] = parsed
+        return parsed
 
     def _is_alnum_keycode(self, keycode: int) -> bool:
         return (ord("0") <= keycode <= ord("9")) or (ord("A") <= keycode <= ord("Z"))
@@ -21,11 +41,10 @@ class ShortcutManager:
     def _is_valid_shortcut(self, shortcut_str: str) -> bool:
         if not shortcut_str:
             return False
-        entry = wx.AcceleratorEntry()
-        if not entry.FromString(shortcut_str):
+        parsed = self._parse(shortcut_str)
+        if not parsed:
             return False
-        keycode = entry.GetKeyCode()
-        flags = entry.GetFlags()
+        flags, keycode = parsed
 
         if self._is_alnum_keycode(keycode):
             if not (flags & (wx.ACCEL_CTRL | wx.ACCEL_ALT)):
@@ -52,22 +71,29 @@ class ShortcutManager:
         
         if callback:
             self.callbacks[action_id] = callback
+        self._rebuild_dispatch()
 
     def update_shortcut(self, action_id: str, new_shortcut: str):
         if action_id in self.registry:
+            if self.current_shortcuts.get(action_id) == new_shortcut:
+                return  # unchanged; nothing to write
             if not self._is_valid_shortcut(new_shortcut):
                 logger.info(f"Rejected invalid shortcut for {action_id}: {new_shortcut}")
                 return
             self.current_shortcuts[action_id] = new_shortcut
+            self._rebuild_dispatch()
             self._save()
 
     def reset_to_defaults(self):
+        changed = False
         for action_id, (desc, default, _) in self.registry.items():
-            if self._is_valid_shortcut(default):
-                self.current_shortcuts[action_id] = default
-            else:
-                self.current_shortcuts[action_id] = ""
-        self._save()
+            shortcut = default if self._is_valid_shortcut(default) else ""
+            if self.current_shortcuts.get(action_id) != shortcut:
+                self.current_shortcuts[action_id] = shortcut
+                changed = True
+        if changed:
+            self._rebuild_dispatch()
+            self._save()
 
     def _save(self):
         config.set("shortcuts", self.current_shortcuts)
@@ -85,6 +111,7 @@ class ShortcutManager:
 
     def build_accelerator_table(self, window: wx.Window):
         entries = []
+        bindings = []
         
         for action_id, shortcut_str in self.current_shortcuts.items():
             if not shortcut_str: continue
@@ -98,63 +125,61 @@ class ShortcutManager:
             if action_id not in self.callbacks:
                 continue
                 
-            accel_entry = wx.AcceleratorEntry()
-            if accel_entry.FromString(shortcut_str):
-                # We need a new ID for this command
-                wx_id = wx.NewIdRef()
-                entries.append(wx.AcceleratorEntry(accel_entry.GetFlags(), accel_entry.GetKeyCode(), wx_id))
-                
-                # Bind the event on the window to the callback
-                window.Bind(wx.EVT_MENU, self.callbacks[action_id], id=wx_id)
+            parsed = self._parse(shortcut_str)
+            if parsed:
+                # Keep one command ID per action so rebuilding the table doesn't allocate new ones
+                wx_id = self._wx_ids.get(action_id)
+                if wx_id is None:
+                    wx_id = self._wx_ids[action_id] = wx.NewIdRef()
+                flags, keycode = parsed
+                entries.append(wx.AcceleratorEntry(flags, keycode, wx_id))
+                bindings.append((wx_id, self.callbacks[action_id]))
         
         accel_table = wx.AcceleratorTable(entries)
         window.SetAcceleratorTable(accel_table)
 
+        # Bind the events on the window to the callbacks; drop any handler from a previous build first
+        for wx_id, callback in bindings:
+            window.Unbind(wx.EVT_MENU, id=wx_id)
+            window.Bind(wx.EVT_MENU, callback, id=wx_id)
+
+    def _rebuild_dispatch(self):
+        dispatch: Dict[Tuple[int, int], Set[str]] = {}
+        for action_id, shortcut in self.current_shortcuts.items():
+            parsed = self._parse(shortcut) if shortcut else None
+            if parsed:
+                flags, keycode = parsed
+                key = (flags & (wx.ACCEL_CTRL | wx.ACCEL_ALT | wx.ACCEL_SHIFT), keycode)
+                dispatch.setdefault(key, set()).add(action_id)
+        self._dispatch = {key: frozenset(ids) for key, ids in dispatch.items()}
+
+    def actions_for_event(self, event: wx.KeyEvent) -> FrozenSet[str]:
+        """
+        Action IDs whose shortcut is the given key event, in one lookup.
+        Handlers that test several actions should call this once per key press.
+        """
+        return self._actions_for(event.GetKeyCode(), event.ControlDown(), event.AltDown(), event.ShiftDown())
+
+    def actions_for_key(self, keycode: int, mods: int) -> FrozenSet[str]:
+        """
+        Like actions_for_event, for a keycode and wx.MOD_* flags.
+        """
+        return self._actions_for(keycode, bool(mods & wx.MOD_CONTROL), bool(mods & wx.MOD_ALT), bool(mods & wx.MOD_SHIFT))
+
     def matches_event(self, action_id: str, event: wx.KeyEvent) -> bool:
         """
         Checks if the given key event matches the shortcut for the action.
         """
-        shortcut = self.current_shortcuts.get(action_id)
-        if not shortcut:
-            return False
-            
-        entry = wx.AcceleratorEntry()
-        if not entry.FromString(shortcut):
-            return False
-            
-        target_flags = entry.GetFlags()
-        target_key = entry.GetKeyCode()
-        
-        return self._matches_keycode_and_mods(target_flags, target_key, event.GetKeyCode(),
-                                              event.ControlDown(), event.AltDown(), event.ShiftDown())
+        return action_id in self.actions_for_event(event)
 
     def matches_key(self, action_id: str, keycode: int, mods: int) -> bool:
         """
         Checks if the given keycode/modifiers match the shortcut for the action.
         mods should use wx.MOD_* flags.
         """
-        shortcut = self.current_shortcuts.get(action_id)
-        if not shortcut:
-            return False
+        return action_id in self.actions_for_key(keycode, mods)
 
-        entry = wx.AcceleratorEntry()
-        if not entry.FromString(shortcut):
-            return False
-
-        target_flags = entry.GetFlags()
-        target_key = entry.GetKeyCode()
-
-        return self._matches_keycode_and_mods(
-            target_flags,
-            target_key,
-            keycode,
-            bool(mods & wx.MOD_CONTROL),
-            bool(mods & wx.MOD_ALT),
-            bool(mods & wx.MOD_SHIFT),
-        )
-
-    def _matches_keycode_and_mods(self, target_flags: int, target_key: int, evt_key: int,
-                                  ctrl: bool, alt: bool, shift: bool) -> bool:
+    def _actions_for(self, evt_key: int, ctrl: bool, alt: bool, shift: bool) -> FrozenSet[str]:
         if ord("a") <= evt_key <= ord("z"):
             evt_key = ord(chr(evt_key).upper())
 
@@ -163,10 +188,7 @@ class ShortcutManager:
         if alt: evt_flags |= wx.ACCEL_ALT
         if shift: evt_flags |= wx.ACCEL_SHIFT
 
-        if (target_flags & (wx.ACCEL_CTRL | wx.ACCEL_ALT | wx.ACCEL_SHIFT)) != evt_flags:
-            return False
-
-        return target_key == evt_key
+        return self._dispatch.get((evt_flags, evt_key), frozenset())
 
 # Global instance
 shortcut_manager = ShortcutManager()
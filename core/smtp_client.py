@@ -3,17 +3,69 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
+from email.generator import BytesGenerator
+import base64
+import io
 import logging
 import os
+import re
+import threading
+import time
+import uuid
+import weakref
+from typing import Dict, List, Optional
 from ..core.account_manager import AccountManager
 
 logger = logging.getLogger(__name__)
 
+# Multiple of 57 bytes, so every chunk encodes to whole 76-character base64 lines
+_ATTACHMENT_CHUNK = 57 * 1024
+
+# One client per account, so consecutive sends share a logged-in session
+_CLIENTS: Dict[str, "SMTPClient"] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _close_idle(client_ref):
+    client = client_ref()
+    if client:
+        client._close_if_idle()
+
 class SMTPClient:
+    # Servers drop idle sessions after a few minutes anyway; let go of ours sooner
+    IDLE_SECONDS = 60
+
     def __init__(self, account_email: str):
         self.email = account_email
         self.account_manager = AccountManager()
+        self._server: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+        self._idle_timer: Optional[threading.Timer] = None
+        self._last_used = 0.0
+        # Account record and password, looked up on the first send
+        self._account = None
+        self._password: Optional[str] = None
+
+    @classmethod
+    def for_account(cls, account_email: str) -> "SMTPClient":
+        """
+        Shared client for the account, reusing its SMTP session between sends.
+        """
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(account_email)
+            if client is None:
+                client = _CLIENTS[account_email] = cls(account_email)
+            return client
+
+    @classmethod
+    def discard(cls, account_email: str):
+        """
+        Forget and close the shared client for an account (e.g. after its settings change).
+        """
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.pop(account_email, None)
+        if client:
+            client.invalidate()
+            client.close()
 
     def send_email(self, to_addrs: list, subject: str, body: str, 
                    cc_addrs: list = None, bcc_addrs: list = None, 
@@ -21,14 +73,19 @@ class SMTPClient:
         """
         Send an email.
         """
-        accounts = self.account_manager.get_accounts()
-        account = next((a for a in accounts if a['email'] == self.email), None)
+        with self._lock:
+            if self._account is None:
+                accounts = self.account_manager.get_accounts()
+                self._account = next((a for a in accounts if a.email == self.email), None)
+            account = self._account
+            if account is not None and self._password is None:
+                self._password = self.account_manager.get_password(self.email)
+            password = self._password
 
         if not account:
             logger.error(f"Account {self.email} not found.")
             return False
 
-        password = self.account_manager.get_password(self.email)
         if not password:
             logger.error(f"No password found for {self.email}")
             return False
@@ -46,13 +103,17 @@ class SMTPClient:
             else:
                 msg.attach(MIMEText(body, 'plain'))
 
+            # Attachment bodies are streamed from disk during DATA; the message only
+            # carries a unique placeholder for each
+            streamed: Dict[bytes, str] = {}
             if attachments:
                 for filepath in attachments:
                     if os.path.exists(filepath):
-                        with open(filepath, "rb") as attachment:
-                            part = MIMEBase("application", "octet-stream")
-                            part.set_payload(attachment.read())
-                        encoders.encode_base64(part)
+                        placeholder = f"attachment-{uuid.uuid4().hex}"
+                        streamed[placeholder.encode("ascii")] = filepath
+                        part = MIMEBase("application", "octet-stream")
+                        part.set_payload(placeholder)
+                        part["Content-Transfer-Encoding"] = "base64"
                         part.add_header(
                             "Content-Disposition",
                             f"attachment; filename= {os.path.basename(filepath)}",
@@ -64,20 +125,157 @@ class SMTPClient:
             # Combine all recipients
             all_recipients = to_addrs + (cc_addrs or []) + (bcc_addrs or [])
 
-            # Connect and send
-            if account['smtp_port'] == 587:
-                server = smtplib.SMTP(account['smtp_host'], account['smtp_port'])
-                server.starttls()
-            else:
-                server = smtplib.SMTP_SSL(account['smtp_host'], account['smtp_port'])
-            
-            server.login(self.email, password)
-            server.sendmail(self.email, all_recipients, msg.as_string())
-            server.quit()
+            with self._lock:
+                try:
+                    server = self._ensure_connection(account, password)
+                    if streamed:
+                        self._send_streamed(server, msg, all_recipients, streamed)
+                    else:
+                        server.send_message(msg, self.email, all_recipients)
+                except Exception:
+                    # Don't hand a session in an unknown state to the next send
+                    self._drop_server()
+                    raise
+                self._last_used = time.monotonic()
+                self._schedule_idle_close()
             
             logger.info(f"Email sent successfully to {all_recipients}")
             return True
 
         except Exception as e:
+            if isinstance(e, smtplib.SMTPAuthenticationError):
+                # The stored password may have changed; read the keyring again next time,
+                # not the account manager's cached copy
+                with self._lock:
+                    self._password = None
+                AccountManager.invalidate_password(self.email)
             logger.error(f"Failed to send email from {self.email}: {e}")
             return False
+
+    def invalidate(self):
+        """
+        Drop the cached account record and password so the next send looks them up again.
+        """
+        with self._lock:
+            self._account = None
+            self._password = None
+
+    def _send_streamed(self, server: smtplib.SMTP, msg, recipients: List[str], files: Dict[bytes, str]):
+        """
+        Send msg the way send_message does, but write each attachment's base64 body
+        straight from its file onto the socket in place of its placeholder, a chunk
+        at a time, so no encoded copy of the file is ever held in memory.
+        Caller must hold self._lock.
+        """
+        out = io.BytesIO()
+        BytesGenerator(out, policy=msg.policy.clone(linesep="\r\n")).flatten(msg, linesep="\r\n")
+        pieces = re.split(b"(" + b"|".join(re.escape(p) for p in files) + b")", out.getvalue())
+
+        server.ehlo_or_helo_if_needed()
+        code, resp = server.mail(self.email)
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, resp, self.email)
+        refused = {}
+        for addr in recipients:
+            code, resp = server.rcpt(addr)
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+        if len(refused) == len(recipients):
+            raise smtplib.SMTPRecipientsRefused(refused)
+        code, resp = server.docmd("data")
+        if code != 354:
+            raise smtplib.SMTPDataError(code, resp)
+
+        for piece in pieces:
+            filepath = files.get(piece)
+            if filepath is None:
+                # Dot-stuff as smtplib.SMTP.data does; base64 lines never start with "."
+                server.send(re.sub(br"(?m)^\.", b"..", piece))
+                continue
+            with open(filepath, "rb") as f:
+                while True:
+                    chunk = f.read(_ATTACHMENT_CHUNK)
+                    if not chunk:
+                        break
+                    server.send(base64.encodebytes(chunk).replace(b"\n", b"\r\n"))
+        if not pieces[-1].endswith(b"\r\n"):
+            server.send(b"\r\n")
+        server.send(b".\r\n")
+        code, resp = server.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+        if refused:
+            logger.warning(f"Recipients refused for {self.email}: {list(refused)}")
+
+    def _ensure_connection(self, account, password: str) -> smtplib.SMTP:
+        """
+        Return the logged-in session, reconnecting if it went away. Caller must hold self._lock.
+        """
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except Exception as e:
+                logger.info(f"SMTP session for {self.email} is gone, reconnecting: {e}")
+            self._drop_server()
+
+        if account.smtp_port == 587:
+            server = smtplib.SMTP(account.smtp_host, account.smtp_port)
+            server.starttls()
+        else:
+            server = smtplib.SMTP_SSL(account.smtp_host, account.smtp_port)
+        try:
+            server.login(self.email, password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        return server
+
+    def _drop_server(self):
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _schedule_idle_close(self):
+        """
+        Arm the idle timer if it isn't running. Caller must hold self._lock.
+        """
+        if self._idle_timer is None:
+            # The timer only holds a weak reference so it doesn't keep a dropped client alive
+            self._idle_timer = threading.Timer(self.IDLE_SECONDS, _close_idle, args=(weakref.ref(self),))
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _close_if_idle(self):
+        with self._lock:
+            self._idle_timer = None
+            if self._server is None:
+                return
+            if time.monotonic() - self._last_used < self.IDLE_SECONDS:
+                self._schedule_idle_close()
+                return
+            server, self._server = self._server, None
+        logger.info(f"Closing idle SMTP session for {self.email}")
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def close(self):
+        """
+        Log out of the SMTP session, if one is open.
+        """
+        with self._lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
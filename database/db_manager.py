@@ -1,17 +1,119 @@
 import sqlite3
 import os
+import json
+import ast
+import atexit
 import logging
-from typing import List, Tuple, Any, Optional
+import threading
+from contextlib import contextmanager
+from typing import List, Tuple, Any, Optional, Iterator
 from ..utils.appdata import get_appdata_dir
 
 logger = logging.getLogger(__name__)
 
+# Shared SQL text for hot statements. sqlite3 caches prepared statements per
+# connection keyed by the exact SQL string, so callers reuse these constants.
+SQL_GET_ACCOUNT_ID = "SELECT id FROM accounts WHERE email = ?"
+SQL_UPSERT_ACCOUNT = """
+INSERT INTO accounts (email, provider_imap_host, provider_imap_port, provider_smtp_host, provider_smtp_port)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(email) DO UPDATE SET
+    provider_imap_host=excluded.provider_imap_host,
+    provider_imap_port=excluded.provider_imap_port,
+    provider_smtp_host=excluded.provider_smtp_host,
+    provider_smtp_port=excluded.provider_smtp_port
+RETURNING id
+"""
+SQL_GET_ACTIVE_ACCOUNTS = "SELECT id, email, provider_imap_host, provider_imap_port, provider_smtp_host, provider_smtp_port FROM accounts WHERE is_active = 1"
+SQL_GET_FOLDER_ID = "SELECT id FROM folders WHERE account_id = ? AND name = ?"
+SQL_UPSERT_FOLDER = """
+INSERT INTO folders (account_id, name, remote_id) VALUES (?, ?, ?)
+ON CONFLICT(account_id, name) DO UPDATE SET remote_id=COALESCE(folders.remote_id, excluded.remote_id)
+RETURNING id
+"""
+SQL_GET_EMAIL_FLAGS = "SELECT flags FROM emails WHERE account_id=? AND folder_id=? AND uid=?"
+SQL_GET_EMAIL_FLAGS_BULK = "SELECT uid, flags FROM emails WHERE account_id=? AND folder_id=? AND uid IN (SELECT value FROM json_each(?))"
+SQL_GET_EMAIL_BODY = "SELECT body_text, body_html FROM emails WHERE account_id=? AND folder_id=? AND uid=?"
+SQL_GET_EMAILS_PAGE = """
+SELECT * FROM emails
+WHERE account_id = ? AND folder_id = ?
+ORDER BY date_received DESC, uid DESC
+LIMIT ? OFFSET ?
+"""
+# Keyset pages: continue below the (date_received, uid) of the previous page's last row.
+# Rows without a date sort after all dated ones and are paged by uid alone.
+SQL_GET_EMAILS_PAGE_BEFORE = """
+SELECT * FROM emails
+WHERE account_id = ? AND folder_id = ? AND (date_received, uid) < (?, ?)
+ORDER BY date_received DESC, uid DESC
+LIMIT ?
+"""
+SQL_GET_EMAILS_UNDATED_BEFORE = """
+SELECT * FROM emails
+WHERE account_id = ? AND folder_id = ? AND date_received IS NULL AND (? IS NULL OR uid < ?)
+ORDER BY uid DESC
+LIMIT ?
+"""
+SQL_UPDATE_EMAIL_FLAGS = "UPDATE emails SET flags = ? WHERE account_id=? AND folder_id=? AND uid=?"
+# One statement for both scopes: pass (None, None) for every account, (id, id) for one
+# account plus the legacy global rules (account_id IS NULL)
+SQL_GET_ACTIVE_RULES = (
+    "SELECT id, name, condition_json, action_json, account_id FROM rules "
+    "WHERE is_active = 1 AND (? IS NULL OR account_id = ? OR account_id IS NULL)"
+)
+SQL_UPSERT_EMAIL_ENVELOPE = """
+INSERT INTO emails (account_id, folder_id, uid, subject, sender, date_received, flags, message_id, in_reply_to, references_list, recipients)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(account_id, folder_id, uid) DO UPDATE SET
+    subject=excluded.subject,
+    sender=excluded.sender,
+    date_received=excluded.date_received,
+    flags=excluded.flags,
+    message_id=excluded.message_id,
+    in_reply_to=excluded.in_reply_to,
+    references_list=excluded.references_list,
+    recipients=excluded.recipients
+"""
+# Inserts the (empty) body of a new row but leaves an existing row's body alone
+SQL_UPSERT_EMAIL_KEEP_BODY = """
+INSERT INTO emails (account_id, folder_id, uid, subject, sender, date_received, flags, message_id, in_reply_to, references_list, body_text, body_html, recipients)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(account_id, folder_id, uid) DO UPDATE SET
+    subject=excluded.subject,
+    sender=excluded.sender,
+    date_received=excluded.date_received,
+    flags=excluded.flags,
+    message_id=excluded.message_id,
+    in_reply_to=excluded.in_reply_to,
+    references_list=excluded.references_list,
+    recipients=excluded.recipients
+"""
+SQL_UPSERT_EMAIL_WITH_BODY = """
+INSERT INTO emails (account_id, folder_id, uid, subject, sender, date_received, flags, message_id, in_reply_to, references_list, body_text, body_html, recipients)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(account_id, folder_id, uid) DO UPDATE SET
+    subject=excluded.subject,
+    sender=excluded.sender,
+    date_received=excluded.date_received,
+    flags=excluded.flags,
+    message_id=excluded.message_id,
+    in_reply_to=excluded.in_reply_to,
+    references_list=excluded.references_list,
+    body_text=excluded.body_text,
+    body_html=excluded.body_html,
+    recipients=excluded.recipients
+"""
+
 class DBManager:
     """
-    Manages SQLite database connections and execution.
+    Manages the SQLite connection and query execution.
+    One connection is shared by every thread, serialized by self._lock, so its page
+    and prepared-statement caches survive between calls.
     """
     _instance = None
     DB_NAME = "email_client.db"
+    # Stored in PRAGMA user_version; bump it when adding a step to _check_and_migrate
+    SCHEMA_VERSION = 1
 
     def __new__(cls):
         if cls._instance is None:
@@ -27,22 +129,89 @@ class DBManager:
         logger.info(f"Database path: {self.db_path}")
 
         schema_path = os.path.join(os.path.dirname(__file__), "schema.sql")
+        is_new = not os.path.exists(self.db_path)
+
+        # Autocommit mode: writes run in explicit transactions (see _transaction)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets reads run alongside a write, and with synchronous=NORMAL a commit
+        # no longer fsyncs; the cache, temp store and mmap keep hot pages in memory.
+        self._conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-65536;"
+            "PRAGMA mmap_size=268435456;"
+        )
         
-        if not os.path.exists(self.db_path):
+        if is_new:
             logger.info("Database file not found. Creating new database.")
             self._create_tables(schema_path)
+            # schema.sql is already the latest layout
+            with self._lock:
+                self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
         else:
             self._create_tables(schema_path)
             self._check_and_migrate()
 
+        # Give the query planner statistics now (0x10002: check every table, cheap when
+        # nothing changed) and refresh them from this session's queries on exit
+        try:
+            with self._lock:
+                self._conn.execute("PRAGMA optimize=0x10002")
+        except Exception as e:
+            logger.warning(f"PRAGMA optimize failed: {e}")
+        atexit.register(self.close)
+
+    def close(self):
+        """
+        Refresh planner statistics and close the connection. Called at interpreter exit.
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute("PRAGMA optimize")
+            except Exception as e:
+                logger.warning(f"PRAGMA optimize failed: {e}")
+            self._conn.close()
+            self._conn = None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Hold the connection for one BEGIN IMMEDIATE ... COMMIT, rolling back on error.
+        Nested use joins the outer transaction.
+        """
+        with self._lock:
+            if self._conn.in_transaction:
+                yield self._conn
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
     def _check_and_migrate(self):
         """
-        Check for missing columns and add them.
+        Bring a database older than SCHEMA_VERSION up to date: add missing columns
+        and convert legacy data. Up-to-date databases only read user_version.
         """
         try:
-            # Check emails table for new columns
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock:
+                version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= self.SCHEMA_VERSION:
+                return
+
+            # Version 0 covers every database made before user_version was kept, whatever
+            # it already has, so each step below checks before changing anything
+            with self._transaction() as conn:
                 cursor = conn.cursor()
+                # Check emails table for new columns
                 cursor.execute("PRAGMA table_info(emails)")
                 columns = [info[1] for info in cursor.fetchall()]
                 
@@ -54,6 +223,13 @@ class DBManager:
                     logger.info("Migrating: Adding references_list column to emails table")
                     cursor.execute("ALTER TABLE emails ADD COLUMN references_list TEXT")
 
+                cursor.execute("PRAGMA table_info(folders)")
+                folder_columns = [info[1] for info in cursor.fetchall()]
+
+                if 'uidvalidity' not in folder_columns:
+                    logger.info("Migrating: Adding uidvalidity column to folders table")
+                    cursor.execute("ALTER TABLE folders ADD COLUMN uidvalidity INTEGER")
+
                 # Check rules table for account_id column
                 cursor.execute("PRAGMA table_info(rules)")
                 rules_columns = [info[1] for info in cursor.fetchall()]
@@ -61,8 +237,33 @@ class DBManager:
                 if 'account_id' not in rules_columns:
                     logger.info("Migrating: Adding account_id column to rules table")
                     cursor.execute("ALTER TABLE rules ADD COLUMN account_id INTEGER REFERENCES accounts(id)")
-                    
-                conn.commit()
+
+                # Folder names are unique per account; databases created before that was in
+                # the schema get a unique index, dropping any duplicate rows (and their cached emails) first
+                cursor.execute("SELECT 1 FROM pragma_index_list('folders') WHERE \"unique\" = 1")
+                if not cursor.fetchone():
+                    logger.info("Migrating: Adding unique index on folders(account_id, name)")
+                    cursor.execute("DELETE FROM folders WHERE id NOT IN (SELECT MIN(id) FROM folders GROUP BY account_id, name)")
+                    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_folders_account_name ON folders(account_id, name)")
+
+                # Flags used to be stored as a Python list repr; rewrite them as JSON.
+                # JSON never uses single quotes, so converted rows stop matching.
+                cursor.execute("SELECT id, flags FROM emails WHERE flags LIKE '%''%' OR flags = 'None'")
+                legacy_flags = cursor.fetchall()
+                if legacy_flags:
+                    logger.info(f"Migrating: Converting flags of {len(legacy_flags)} emails to JSON")
+                    updates = []
+                    for row_id, raw in legacy_flags:
+                        try:
+                            flags = ast.literal_eval(raw)
+                        except (ValueError, SyntaxError):
+                            flags = []
+                        updates.append((json.dumps(list(flags or [])), row_id))
+                    cursor.executemany("UPDATE emails SET flags = ? WHERE id = ?", updates)
+
+                # Part of the same transaction: a failed migration is retried on the next start
+                cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                logger.info(f"Database migrated from schema version {version} to {self.SCHEMA_VERSION}")
         except Exception as e:
             logger.error(f"Migration failed: {e}")
 
@@ -71,63 +272,50 @@ class DBManager:
             with open(schema_path, 'r') as f:
                 schema_sql = f.read()
             
-            with sqlite3.connect(self.db_path) as conn:
-                conn.executescript(schema_sql)
+            with self._lock:
+                self._conn.executescript(schema_sql)
             logger.info("Database schema initialized.")
         except Exception as e:
             logger.error(f"Failed to initialize database schema: {e}")
             raise
 
-    def execute(self, query: str, params: Tuple = ()) -> sqlite3.Cursor:
+    def execute_commit(self, query: str, params: Tuple = ()) -> int:
         """
-        Execute a query and return the cursor. 
-        Note: This does not commit. Use execute_commit for write operations.
+        Execute a write query and commit. Returns lastrowid.
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            # Enable dictionary cursor for easier access
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor
+            with self._transaction() as conn:
+                cursor = conn.execute(query, params)
+                return cursor.lastrowid
         except Exception as e:
-            logger.error(f"Database execution error: {query} with {params} - {e}")
+            logger.error(f"Database commit error: {query} with {params} - {e}")
             raise
 
-    def execute_commit(self, query: str, params: Tuple = ()) -> int:
+    def execute_many(self, query: str, params_seq: List[Tuple]) -> None:
         """
-        Execute a write query and commit. Returns lastrowid.
+        Execute a write query for each parameter tuple in one transaction.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                conn.commit()
-                return cursor.lastrowid
+            with self._transaction() as conn:
+                conn.executemany(query, params_seq)
         except Exception as e:
-            logger.error(f"Database commit error: {query} with {params} - {e}")
+            logger.error(f"Database executemany error: {query} ({len(params_seq)} rows) - {e}")
             raise
 
     def fetch_one(self, query: str, params: Tuple = ()) -> Optional[dict]:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                row = cursor.fetchone()
-                return dict(row) if row else None
+            with self._lock:
+                row = self._conn.execute(query, params).fetchone()
+            return dict(row) if row else None
         except Exception as e:
             logger.error(f"Database fetch_one error: {query} with {params} - {e}")
             return None
 
     def fetch_all(self, query: str, params: Tuple = ()) -> List[dict]:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                return [dict(row) for row in rows]
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            return [dict(row) for row in rows]
         except Exception as e:
             logger.error(f"Database fetch_all error: {query} with {params} - {e}")
             return []
@@ -135,111 +323,120 @@ class DBManager:
     # --- Domain Specific Methods ---
 
     def upsert_account(self, email, imap_host, imap_port, smtp_host, smtp_port):
-        query = """
-        INSERT INTO accounts (email, provider_imap_host, provider_imap_port, provider_smtp_host, provider_smtp_port)
-        VALUES (?, ?, ?, ?, ?)
-        ON CONFLICT(email) DO UPDATE SET
-            provider_imap_host=excluded.provider_imap_host,
-            provider_imap_port=excluded.provider_imap_port,
-            provider_smtp_host=excluded.provider_smtp_host,
-            provider_smtp_port=excluded.provider_smtp_port
         """
-        self.execute_commit(query, (email, imap_host, imap_port, smtp_host, smtp_port))
+        Insert or update an account and return its id, in one statement.
+        """
+        try:
+            with self._transaction() as conn:
+                return conn.execute(SQL_UPSERT_ACCOUNT, (email, imap_host, imap_port, smtp_host, smtp_port)).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Database upsert_account error for {email} - {e}")
+            raise
 
     def get_account_id(self, email):
-        res = self.fetch_one("SELECT id FROM accounts WHERE email = ?", (email,))
+        res = self.fetch_one(SQL_GET_ACCOUNT_ID, (email,))
         return res['id'] if res else None
 
     def upsert_folder(self, account_id, name, remote_id=None):
-        # Unique constraint is not set in schema for folder name per account, logic handled here just in case
-        # Consider adding UNIQUE(account_id, name) to enforce this in the schema.
-        res = self.fetch_one("SELECT id FROM folders WHERE account_id = ? AND name = ?", (account_id, name))
+        # Known folders are the common case; answer those without starting a write
+        res = self.fetch_one(SQL_GET_FOLDER_ID, (account_id, name))
         if res:
             return res['id']
-        
-        return self.execute_commit("INSERT INTO folders (account_id, name, remote_id) VALUES (?, ?, ?)", 
-                                   (account_id, name, remote_id or name))
+
+        # UNIQUE(account_id, name) makes a racing insert of the same folder resolve to one row
+        try:
+            with self._transaction() as conn:
+                return conn.execute(SQL_UPSERT_FOLDER, (account_id, name, remote_id or name)).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Database upsert_folder error for {name} - {e}")
+            raise
 
     def get_folder_id(self, account_id, name):
-        res = self.fetch_one("SELECT id FROM folders WHERE account_id = ? AND name = ?", (account_id, name))
+        res = self.fetch_one(SQL_GET_FOLDER_ID, (account_id, name))
         return res['id'] if res else None
 
+    def get_folder_uidvalidity(self, folder_id):
+        res = self.fetch_one("SELECT uidvalidity FROM folders WHERE id = ?", (folder_id,))
+        return res['uidvalidity'] if res else None
+
+    def set_folder_uidvalidity(self, folder_id, uidvalidity):
+        self.execute_commit("UPDATE folders SET uidvalidity = ? WHERE id = ?", (uidvalidity, folder_id))
+
+    def delete_folder_emails(self, account_id, folder_id):
+        self.execute_commit("DELETE FROM emails WHERE account_id = ? AND folder_id = ?", (account_id, folder_id))
+
     def upsert_email(self, account_id, folder_id, uid, subject, sender, date, flags, message_id=None, in_reply_to=None, references=None, body_text=None, body_html=None, recipients=None):
-        # We use INSERT OR REPLACE or ON CONFLICT UPDATE
-        # Unique constraint on (account_id, folder_id, uid)
-        
-        query = """
-        INSERT INTO emails (account_id, folder_id, uid, subject, sender, date_received, flags, message_id, in_reply_to, references_list, body_text, body_html, recipients)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(account_id, folder_id, uid) DO UPDATE SET
-            subject=excluded.subject,
-            sender=excluded.sender,
-            date_received=excluded.date_received,
-            flags=excluded.flags,
-            message_id=excluded.message_id,
-            in_reply_to=excluded.in_reply_to,
-            references_list=excluded.references_list,
-            recipients=excluded.recipients
-        """
-        # If body is provided, update it too. If not (e.g. list fetch), keep existing?
-        # Standard list fetch doesn't have body.
-        # Only update body when provided.
-        
-        params = [account_id, folder_id, uid, subject, sender, date, str(flags), message_id, in_reply_to, references, body_text, body_html, recipients]
-        
+        # Unique constraint on (account_id, folder_id, uid); only update the body when one is provided
+        flags_json = json.dumps(flags or [])
         if body_text is None and body_html is None:
-             # Logic to avoid overwriting body with NULL
-             query = """
-                INSERT INTO emails (account_id, folder_id, uid, subject, sender, date_received, flags, message_id, in_reply_to, references_list, recipients)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(account_id, folder_id, uid) DO UPDATE SET
-                    subject=excluded.subject,
-                    sender=excluded.sender,
-                    date_received=excluded.date_received,
-                    flags=excluded.flags,
-                    message_id=excluded.message_id,
-                    in_reply_to=excluded.in_reply_to,
-                    references_list=excluded.references_list,
-                    recipients=excluded.recipients
-            """
-             params = [account_id, folder_id, uid, subject, sender, date, str(flags), message_id, in_reply_to, references, recipients]
-        elif body_text or body_html:
-             # We have body, update it.
-             query = """
-                INSERT INTO emails (account_id, folder_id, uid, subject, sender, date_received, flags, message_id, in_reply_to, references_list, body_text, body_html, recipients)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(account_id, folder_id, uid) DO UPDATE SET
-                    subject=excluded.subject,
-                    sender=excluded.sender,
-                    date_received=excluded.date_received,
-                    flags=excluded.flags,
-                    message_id=excluded.message_id,
-                    in_reply_to=excluded.in_reply_to,
-                    references_list=excluded.references_list,
-                    body_text=excluded.body_text,
-                    body_html=excluded.body_html,
-                    recipients=excluded.recipients
-             """
-        
-        self.execute_commit(query, tuple(params))
+            # List fetches carry no body; don't overwrite a cached one with NULL
+            self.execute_commit(SQL_UPSERT_EMAIL_ENVELOPE, (account_id, folder_id, uid, subject, sender, date, flags_json, message_id, in_reply_to, references, recipients))
+            return
+
+        query = SQL_UPSERT_EMAIL_WITH_BODY if (body_text or body_html) else SQL_UPSERT_EMAIL_KEEP_BODY
+        self.execute_commit(query, (account_id, folder_id, uid, subject, sender, date, flags_json, message_id, in_reply_to, references, body_text, body_html, recipients))
 
-    def get_emails(self, account_id, folder_id, limit=100, offset=0):
-        query = """
-        SELECT * FROM emails 
-        WHERE account_id = ? AND folder_id = ?
-        ORDER BY date_received DESC, uid DESC
-        LIMIT ? OFFSET ?
+    def upsert_emails_bulk(self, account_id, folder_id, rows):
         """
-        return self.fetch_all(query, (account_id, folder_id, limit, offset))
+        Upsert many envelope rows (no body) for one folder in a single transaction.
+        Each row is (uid, subject, sender, date, flags, message_id, in_reply_to, references, recipients).
+        """
+        if not rows:
+            return
+
+        params = [
+            (account_id, folder_id, uid, subject, sender, date, json.dumps(flags or []), message_id, in_reply_to, references, recipients)
+            for uid, subject, sender, date, flags, message_id, in_reply_to, references, recipients in rows
+        ]
+        try:
+            with self._transaction() as conn:
+                conn.executemany(SQL_UPSERT_EMAIL_ENVELOPE, params)
+        except Exception as e:
+            logger.error(f"Database bulk upsert error for {len(params)} emails - {e}")
+            raise
+
+    def get_emails(self, account_id, folder_id, limit=100, offset=0, before=None):
+        """
+        One page of a folder's emails, newest first.
+        before is the (date_received, uid) of the previous page's last row; when given, the page
+        is read onwards from there in the index and offset is ignored, so deep pages cost the same.
+        """
+        if before is None:
+            return self.fetch_all(SQL_GET_EMAILS_PAGE, (account_id, folder_id, limit, offset))
+
+        date, uid = before
+        rows = []
+        if date is not None:
+            rows = self.fetch_all(SQL_GET_EMAILS_PAGE_BEFORE, (account_id, folder_id, date, uid, limit))
+            uid = None  # any undated rows come next, from the top
+        if len(rows) < limit:
+            rows += self.fetch_all(SQL_GET_EMAILS_UNDATED_BEFORE, (account_id, folder_id, uid, uid, limit - len(rows)))
+        return rows
 
     def get_email_body(self, account_id, folder_id, uid):
-        return self.fetch_one("SELECT body_text, body_html FROM emails WHERE account_id=? AND folder_id=? AND uid=?", (account_id, folder_id, uid))
+        return self.fetch_one(SQL_GET_EMAIL_BODY, (account_id, folder_id, uid))
 
     def get_email_flags(self, account_id, folder_id, uid):
-        res = self.fetch_one("SELECT flags FROM emails WHERE account_id=? AND folder_id=? AND uid=?", (account_id, folder_id, uid))
+        res = self.fetch_one(SQL_GET_EMAIL_FLAGS, (account_id, folder_id, uid))
         return res["flags"] if res else None
 
+    def get_email_flags_bulk(self, account_id, folder_id, uids):
+        """
+        Return {uid: flags_json} for the given UIDs in one query.
+        """
+        rows = self.fetch_all(SQL_GET_EMAIL_FLAGS_BULK, (account_id, folder_id, json.dumps(list(uids))))
+        return {row["uid"]: row["flags"] for row in rows}
+
     def update_email_flags(self, account_id, folder_id, uid, flags):
-        self.execute_commit("UPDATE emails SET flags = ? WHERE account_id=? AND folder_id=? AND uid=?", (str(flags), account_id, folder_id, uid))
+        self.execute_commit(SQL_UPDATE_EMAIL_FLAGS, (json.dumps(flags or []), account_id, folder_id, uid))
+
+    def update_email_flags_many(self, items):
+        """
+        Set the flags of many emails in one transaction.
+        Each item is (flags, account_id, folder_id, uid), flags being a list as for update_email_flags.
+        """
+        params = [(json.dumps(flags or []), account_id, folder_id, uid) for flags, account_id, folder_id, uid in items]
+        if params:
+            self.execute_many(SQL_UPDATE_EMAIL_FLAGS, params)
 
 db_manager = DBManager()
@@ -23,7 +23,9 @@ CREATE TABLE IF NOT EXISTS folders (
     parent_id INTEGER,
     type TEXT, -- 'inbox', 'sent', 'trash', 'drafts', 'custom'
     message_count INTEGER DEFAULT 0,
-    FOREIGN KEY(account_id) REFERENCES accounts(id) ON DELETE CASCADE
+    uidvalidity INTEGER, -- Server UIDVALIDITY the cached emails' UIDs belong to
+    FOREIGN KEY(account_id) REFERENCES accounts(id) ON DELETE CASCADE,
+    UNIQUE(account_id, name)
 );
 
 -- Emails Table
@@ -50,6 +52,10 @@ CREATE TABLE IF NOT EXISTS emails (
     UNIQUE(account_id, folder_id, uid)
 );
 
+-- Serves get_emails' filter and sort order as a range scan, with no sort step.
+-- Lookups by (account_id, folder_id, uid) already use the UNIQUE constraint's index.
+CREATE INDEX IF NOT EXISTS idx_emails_list ON emails(account_id, folder_id, date_received DESC, uid DESC);
+
 -- Rules Table
 -- Stores smart folder rules.
 CREATE TABLE IF NOT EXISTS rules (
@@ -26,7 +26,7 @@ class ComposeDialog(wx.Dialog):
             # Default to first account if available
             accounts = self.account_manager.get_accounts()
             if accounts:
-                self.account_email = accounts[0]['email']
+                self.account_email = accounts[0].email
         
         self.init_ui()
         self.apply_signature()
@@ -172,7 +172,7 @@ class ComposeDialog(wx.Dialog):
             progress = None
         
         try:
-            client = SMTPClient(self.account_email)
+            client = SMTPClient.for_account(self.account_email)
             # Handle multiple recipients if separated by comma/semicolon
             recipients = [r.strip() for r in recipient.replace(';', ',').split(',') if r.strip()]
             cc_list = [r.strip() for r in cc_raw.replace(';', ',').split(',') if r.strip()]
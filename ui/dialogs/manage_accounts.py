@@ -66,11 +66,11 @@ class ManageAccountsDialog(wx.Dialog):
         self.accounts = self.account_manager.get_accounts()
         
         for account in self.accounts:
-            idx = self.list.InsertItem(self.list.GetItemCount(), account['email'])
-            self.list.SetItem(idx, 1, account['imap_host'])
-            self.list.SetItem(idx, 2, account['smtp_host'])
+            idx = self.list.InsertItem(self.list.GetItemCount(), account.email)
+            self.list.SetItem(idx, 1, account.imap_host)
+            self.list.SetItem(idx, 2, account.smtp_host)
             # Store account index or ID if needed, but we have self.accounts which matches index order
-            # self.list.SetItemData(idx, account['id']) # if listctrl supports it
+            # self.list.SetItemData(idx, account.id) # if listctrl supports it
 
         if self.accounts:
             self.list.Select(0)
@@ -92,7 +92,7 @@ class ManageAccountsDialog(wx.Dialog):
             return
 
         if idx < len(self.accounts):
-            account_data = self.accounts[idx]
+            account_data = self.accounts[idx]._asdict()
             dlg = AccountDialog(self, account_data=account_data)
             if dlg.ShowModal() == wx.ID_OK:
                 self.load_accounts()
@@ -106,7 +106,7 @@ class ManageAccountsDialog(wx.Dialog):
             return
 
         if idx < len(self.accounts):
-            email = self.accounts[idx]['email']
+            email = self.accounts[idx].email
             if wx.MessageBox(f"Are you sure you want to delete account {email}?\nThis will remove all downloaded emails for this account.", 
                              "Confirm Delete", wx.YES_NO | wx.ICON_QUESTION) == wx.YES:
                 
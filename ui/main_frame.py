@@ -118,8 +118,8 @@ class MainFrame(wx.Frame):
             return
 
         # Fetch folders for this account
-        from ..core.imap_client import IMAPClient
-        client = IMAPClient(account)
+        from ..core.imap_pool import imap_pool
+        client = imap_pool.get(account)
         try:
             folder_list = client.list_folders()
             folders = [f['name'] for f in folder_list]
@@ -151,7 +151,7 @@ class MainFrame(wx.Frame):
         if not accounts:
             return
         from .dialogs.compose import ComposeDialog
-        current_account = self.email_list_panel.current_account or accounts[0]['email']
+        current_account = self.email_list_panel.current_account or accounts[0].email
         dialog = ComposeDialog(self, account_email=current_account, initial_to="raut.abhishek@zohomail.in", compose_mode="new")
         dialog.ShowModal()
         dialog.Destroy()
@@ -201,7 +201,7 @@ class MainFrame(wx.Frame):
              from ..core.account_manager import AccountManager
              accounts = AccountManager().get_accounts()
              if accounts:
-                 account_email = accounts[0]['email']
+                 account_email = accounts[0].email
              else:
                  wx.MessageBox("No accounts configured.", "Error", wx.OK | wx.ICON_ERROR)
                  return
@@ -210,10 +210,9 @@ class MainFrame(wx.Frame):
         if input_dlg.ShowModal() == wx.ID_OK:
             folder_name = input_dlg.GetValue()
             if folder_name:
-                from ..core.imap_client import IMAPClient
-                # We need to reuse the client if possible to avoid reconnect
-                # But creating a new one is safe enough
-                client = IMAPClient(account_email)
+                from ..core.imap_pool import imap_pool
+                # Reuse the pooled session to avoid a reconnect
+                client = imap_pool.get(account_email)
                 if client.create_folder(folder_name):
                     speaker.speak(f"Folder {folder_name} created.")
                     wx.MessageBox(f"Folder '{folder_name}' created successfully.", "Success", wx.OK | wx.ICON_INFORMATION)
@@ -251,7 +250,7 @@ class MainFrame(wx.Frame):
         from .dialogs.compose import ComposeDialog
         current_account = self.email_list_panel.current_account
         if not current_account and accounts:
-            current_account = accounts[0]['email']
+            current_account = accounts[0].email
             
         dialog = ComposeDialog(self, account_email=current_account, compose_mode="new")
         dialog.ShowModal()
@@ -281,7 +280,7 @@ class MainFrame(wx.Frame):
             body = f"\n\n--- Original Message ---\nFrom: {sender}\nDate: {email.get('date')}\nSubject: {email.get('subject')}\n\n{body}"
 
         from .dialogs.compose import ComposeDialog
-        current_account = self.email_list_panel.current_account or accounts[0]['email']
+        current_account = self.email_list_panel.current_account or accounts[0].email
         
         dialog = ComposeDialog(self, account_email=current_account, 
                                initial_to=sender, initial_subject=subject, initial_body=body, compose_mode="reply")
@@ -311,7 +310,7 @@ class MainFrame(wx.Frame):
         # Body content may not be cached yet.
         
         from .dialogs.compose import ComposeDialog
-        current_account = self.email_list_panel.current_account or accounts[0]['email']
+        current_account = self.email_list_panel.current_account or accounts[0].email
         
         dialog = ComposeDialog(self, account_email=current_account, 
                                initial_subject=subject, initial_body=body, compose_mode="forward")
@@ -333,22 +332,23 @@ class MainFrame(wx.Frame):
             if keycode == wx.WXK_ESCAPE:
                 self.on_focus_message_list(None)
                 return
-            if shortcut_manager.matches_event("focus_message_list", event):
+            actions = shortcut_manager.actions_for_event(event)
+            if "focus_message_list" in actions:
                 self.on_focus_message_list(None)
                 return
-            if shortcut_manager.matches_event("reply", event):
+            if "reply" in actions:
                 self.on_reply(None)
                 return
-            if shortcut_manager.matches_event("forward", event):
+            if "forward" in actions:
                 self.on_forward(None)
                 return
-            if shortcut_manager.matches_event("delete", event):
+            if "delete" in actions:
                 self.on_delete(None)
                 return
-            if shortcut_manager.matches_event("archive", event):
+            if "archive" in actions:
                 self.on_archive(None)
                 return
-            if shortcut_manager.matches_event("focus_actions", event):
+            if "focus_actions" in actions:
                 if self.message_viewer_panel:
                     self.message_viewer_panel.reply_btn.SetFocus()
                     speaker.speak("Actions")
@@ -16,6 +16,7 @@ _IST = timezone(timedelta(hours=5, minutes=30))
 
 class EmailListPanel(wx.Panel):
     AUTO_REFRESH_INTERVAL_MS = 60000  # 60 seconds
+    PREFETCH_BODIES = 5  # Conversations at the top of the list whose bodies are fetched ahead
 
     def __init__(self, parent):
         super().__init__(parent)
@@ -212,21 +213,17 @@ class EmailListPanel(wx.Panel):
                     except:
                         pass  # folder may already exist
                     
-                    # Re-select source folder in read-write mode (fetch_threads opened readonly)
-                    # Use lock to prevent interference with concurrent operations
-                    with repository.imap_client._lock:
-                        repository.imap_client.select_folder(current_folder, readonly=False)
-                    
+                    # The client selects current_folder read-write under its lock for each command
                     move_uids = [uid for uid, exclusive in items if exclusive]
                     copy_uids = [uid for uid, exclusive in items if not exclusive]
                     if move_uids:
                         print(f"[RULE MOVE] Pass {rule_pass+1}: Moving {len(move_uids)} emails to '{target}'")
-                        if repository.move_emails(move_uids, target):
+                        if repository.move_emails(move_uids, target, source_folder=current_folder):
                             batch_moved += len(move_uids)
                             moved_count += len(move_uids)
                         else:
                             print(f"[RULE MOVE] FAILED to move emails to '{target}'")
-                    if copy_uids and repository.copy_emails(copy_uids, target):
+                    if copy_uids and repository.copy_emails(copy_uids, target, source_folder=current_folder):
                         batch_moved += len(copy_uids)
                         moved_count += len(copy_uids)
 
@@ -246,6 +243,10 @@ class EmailListPanel(wx.Panel):
 
         wx.CallAfter(self._finish_load_emails, token, raw_threads, moved_count, error)
 
+        if not error and raw_threads:
+            # The list is already on its way to the UI; warm the body cache for the top conversations
+            repository.prefetch_bodies(current_folder, [t["uid"] for t in raw_threads[:self.PREFETCH_BODIES]])
+
     def _finish_load_emails(self, token: int, raw_threads, moved_count: int, error: Exception):
         if token != self._load_token:
             return
@@ -406,21 +407,22 @@ class EmailListPanel(wx.Panel):
         idx = self.list.GetFocusedItem()
         if idx == -1:
             idx = self.list.GetFirstSelected()
+        actions = shortcut_manager.actions_for_event(event)
         
-        if keycode == wx.WXK_RETURN or keycode == wx.WXK_TAB or shortcut_manager.matches_event("open_email", event):
+        if keycode == wx.WXK_RETURN or keycode == wx.WXK_TAB or "open_email" in actions:
             if idx != -1:
                 self._open_selected(idx)
                 return
 
-        elif shortcut_manager.matches_event("next_page", event) or keycode == wx.WXK_PAGEDOWN:
+        elif "next_page" in actions or keycode == wx.WXK_PAGEDOWN:
             self.on_next_page()
             return
 
-        elif shortcut_manager.matches_event("prev_page", event) or keycode == wx.WXK_PAGEUP:
+        elif "prev_page" in actions or keycode == wx.WXK_PAGEUP:
             self.on_prev_page()
             return
 
-        elif shortcut_manager.matches_event("expand_thread", event):
+        elif "expand_thread" in actions:
             if self.view_mode == "threads" and idx != -1:
                 email = self.current_view_emails[idx]
                 children = email.get("children", [])
@@ -439,7 +441,7 @@ class EmailListPanel(wx.Panel):
                     speaker.speak("No replies in this conversation.")
             return
 
-        elif shortcut_manager.matches_event("collapse_thread", event):
+        elif "collapse_thread" in actions:
             if self.view_mode == "conversation":
                 self.exit_thread_view()
             return
@@ -448,11 +450,11 @@ class EmailListPanel(wx.Panel):
                 self.exit_thread_view()
             return
 
-        elif shortcut_manager.matches_event("delete", event):
+        elif "delete" in actions:
             self.delete_selected()
             return
 
-        elif shortcut_manager.matches_event("archive", event):
+        elif "archive" in actions:
             self.archive_selected()
             return
             
@@ -495,15 +497,9 @@ class EmailListPanel(wx.Panel):
         import threading
         def worker():
             try:
-                imap = self.repository.imap_client
-                # Acquire lock to atomically select folder + add flags
-                # This prevents interference with concurrent body fetches
-                with imap._lock:
-                    imap.select_folder(folder, readonly=False)
-                    imap.client.add_flags([uid], ["\\Seen"])
-                # Update DB cache
-                self.repository.add_flags([uid], ["\\Seen"], folder_name=folder)
-                wx.CallAfter(self._apply_read_flag, uid)
+                # Selects folder and stores the flag in one locked block, then updates the DB cache
+                if self.repository.add_flags([uid], ["\\Seen"], folder_name=folder):
+                    wx.CallAfter(self._apply_read_flag, uid)
             except Exception as e:
                 logger.warning(f"Failed to mark read: {e}")
         threading.Thread(target=worker, daemon=True).start()
@@ -558,9 +554,9 @@ class EmailListPanel(wx.Panel):
             
             success = False
             if target:
-                success = self.repository.move_emails([uid], target)
+                success = self.repository.move_emails([uid], target, source_folder=self.current_folder)
             else:
-                success = self.repository.add_flags([uid], ["\\Deleted"])
+                success = self.repository.add_flags([uid], ["\\Deleted"], folder_name=self.current_folder)
             
             if success:
                 speaker.speak("Deleted.")
@@ -593,7 +589,7 @@ class EmailListPanel(wx.Panel):
         target = self._find_target_folder(archive_candidates)
         
         if target:
-            if self.repository.move_emails([uid], target):
+            if self.repository.move_emails([uid], target, source_folder=self.current_folder):
                 speaker.speak("Archived.")
                 self.current_view_emails.pop(idx)
                 if self.view_mode == "threads" and email_obj in self.threads:
@@ -6,7 +6,7 @@ from ...utils.accessible_widgets import AccessibleTreeCtrl
 from ...core.event_bus import EventBus
 from ...core.event_bus import Events
 from ...core.account_manager import AccountManager
-from ...core.imap_client import IMAPClient
+from ...core.imap_pool import imap_pool
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +14,6 @@ class FolderListPanel(wx.Panel):
     def __init__(self, parent):
         super().__init__(parent)
         self.account_manager = AccountManager()
-        self.imap_clients = {} # email -> IMAPClient
         self._initial_selected = False
         self.init_ui()
         
@@ -43,19 +42,19 @@ class FolderListPanel(wx.Panel):
 
     def load_accounts(self):
         self.tree.DeleteChildren(self.root)
-        self.imap_clients = {}
         accounts = self.account_manager.get_accounts()
+        # Log in to all accounts at once instead of one after another
+        imap_pool.connect_all([account.email for account in accounts])
         for account in accounts:
-            self.add_account_node(account['email'])
+            self.add_account_node(account.email)
 
     def on_account_added(self, email):
         wx.CallAfter(self.add_account_node, email)
 
     def add_account_node(self, email):
         try:
-            # Create a client for this account
-            client = IMAPClient(email)
-            self.imap_clients[email] = client
+            # Pooled session for this account; not kept, so the pool can replace it
+            client = imap_pool.get(email)
             
             # Add account node
             account_node = self.tree.AppendItem(self.root, email)
@@ -139,12 +138,7 @@ class FolderListPanel(wx.Panel):
             self.tree.DeleteChildren(account_node)
             
             try:
-                client = self.imap_clients.get(email)
-                if not client:
-                     client = IMAPClient(email)
-                     self.imap_clients[email] = client
-                     
-                folders = client.list_folders()
+                folders = imap_pool.get(email).list_folders()
                 for folder in folders:
                     folder_name = folder['name']
                     folder_node = self.tree.AppendItem(account_node, folder_name)
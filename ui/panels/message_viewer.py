@@ -6,6 +6,7 @@ import html
 import os
 import bs4
 import re
+import threading
 from datetime import datetime, timezone, timedelta
 from email.utils import getaddresses, parsedate_to_datetime
 
@@ -30,6 +31,10 @@ class MessageViewerPanel(wx.Panel):
         self.current_email = None
         self.current_headers = {}
         self.current_attachments = []
+        self._body_token = 0
+        self._body_progress = None
+        self._download_token = 0
+        self._download_progress = None
         self._focus_list_accel_id = None
         self._webview_accel_ids = []
         self.init_ui()
@@ -163,35 +168,62 @@ class MessageViewerPanel(wx.Panel):
             
             if account and folder and uid:
                 speaker.speak("Loading content...")
-                progress = AudibleProgress("Loading content, please wait", interval=6)
-                progress.start()
-                try:
-                    # Use repository
-                    repo = EmailRepository(account)
-                    body_data = repo.fetch_email_body(folder, uid)
-                    
-                    html = body_data.get('html', '')
-                    text = body_data.get('text', '')
-                    self.current_headers = body_data.get('headers', {})
-                    self.current_attachments = body_data.get('attachments', []) or []
-                    self._refresh_attachments()
-                    
-                    if html:
-                        self.webview.SetPage(self._wrap_html(html), "")
-                    elif text:
-                        self.webview.SetPage(self._wrap_plain(text), "")
-                    else:
-                        self.webview.SetPage("<p>No body content found.</p>", "")
-                        
-                except Exception as e:
-                    logger.error(f"Failed to fetch body: {e}")
-                    self.webview.SetPage(f"<p>Error loading content: {e}</p>", "")
-                finally:
-                    progress.stop()
+                self._stop_body_progress()
+                self._body_progress = AudibleProgress("Loading content, please wait", interval=6)
+                self._body_progress.start()
+                # Fetch off the UI thread; stale results are dropped by token
+                self._body_token += 1
+                token = self._body_token
+                threading.Thread(target=self._load_body_worker, args=(token, account, folder, uid), daemon=True).start()
+                return
             
             self.webview.SetFocus()
             speaker.speak("Content loaded and focused. Press Tab for commands or Shift+Tab for message list.")
 
+    def _load_body_worker(self, token: int, account, folder, uid):
+        body_data = {}
+        error = None
+        try:
+            # Use repository
+            repo = EmailRepository(account)
+            body_data = repo.fetch_email_body(folder, uid)
+        except Exception as e:
+            error = e
+        wx.CallAfter(self._finish_load_body, token, body_data, error)
+
+    def _finish_load_body(self, token: int, body_data, error: Exception):
+        if token != self._body_token or not self.webview:
+            return
+        self._stop_body_progress()
+
+        if error:
+            logger.error(f"Failed to fetch body: {error}")
+            self.webview.SetPage(f"<p>Error loading content: {error}</p>", "")
+        else:
+            html = body_data.get('html', '')
+            text = body_data.get('text', '')
+            self.current_headers = body_data.get('headers', {})
+            self.current_attachments = body_data.get('attachments', []) or []
+            self._refresh_attachments()
+            
+            if html:
+                self.webview.SetPage(self._wrap_html(html), "")
+            elif text:
+                self.webview.SetPage(self._wrap_plain(text), "")
+            else:
+                self.webview.SetPage("<p>No body content found.</p>", "")
+        
+        self.webview.SetFocus()
+        speaker.speak("Content loaded and focused. Press Tab for commands or Shift+Tab for message list.")
+
+    def _stop_body_progress(self):
+        if self._body_progress:
+            try:
+                self._body_progress.stop()
+            except Exception:
+                pass
+            self._body_progress = None
+
     def on_email_selected(self, email_data):
         """
         Callback for EMAIL_SELECTED event. Show a lightweight preview.
@@ -199,6 +231,10 @@ class MessageViewerPanel(wx.Panel):
         if not self.webview:
             return
 
+        # A newer selection supersedes any body still loading
+        self._body_token += 1
+        self._stop_body_progress()
+
         subject = email_data.get('subject', 'No Subject')
         sender = email_data.get('sender', 'Unknown')
         
@@ -486,8 +522,7 @@ class MessageViewerPanel(wx.Panel):
 
         att = self.current_attachments[idx]
         filename = att.get("filename", "attachment")
-        data = att.get("data")
-        if not data:
+        if att.get("data") is None and not att.get("section"):
             speaker.speak("Attachment data unavailable")
             return
 
@@ -500,53 +535,92 @@ class MessageViewerPanel(wx.Panel):
             if dlg.ShowModal() == wx.ID_CANCEL:
                 return
             path = dlg.GetPath()
-            progress = None
-            dialog = None
+
+        self._stop_download_progress()
+        self._download_progress = AudibleProgress("Downloading attachment, please wait", interval=6)
+        self._download_progress.start()
+        # Attachment bytes are only fetched from the server when saved, off the UI thread
+        email_data = self.current_email or {}
+        self._download_token += 1
+        token = self._download_token
+        threading.Thread(
+            target=self._download_attachment_worker,
+            args=(token, email_data.get('account'), email_data.get('folder'), email_data.get('uid'), att, path),
+            daemon=True
+        ).start()
+
+    def _download_attachment_worker(self, token: int, account, folder, uid, att, path):
+        data = None
+        error = None
+        try:
+            repo = EmailRepository(account)
+            data = repo.fetch_attachment(folder, uid, att)
+        except Exception as e:
+            error = e
+        wx.CallAfter(self._finish_download_attachment, token, path, data, error)
+
+    def _finish_download_attachment(self, token: int, path, data, error: Exception):
+        if token != self._download_token:
+            return
+        self._stop_download_progress()
+        if error:
+            logger.error(f"Failed to save attachment: {error}")
+            speaker.speak("Failed to save attachment")
+            return
+        if not data:
+            speaker.speak("Attachment data unavailable")
+            return
+
+        dialog = None
+        try:
+            total = len(data)
+            chunk_size = 64 * 1024
+            dialog = wx.ProgressDialog(
+                "Downloading Attachment",
+                "Downloading, please wait...",
+                maximum=100,
+                style=wx.PD_APP_MODAL | wx.PD_CAN_ABORT | wx.PD_ELAPSED_TIME
+            )
+            cancelled = False
+            written = 0
+            with open(path, "wb") as f:
+                for i in range(0, total, chunk_size):
+                    chunk = data[i:i + chunk_size]
+                    f.write(chunk)
+                    written += len(chunk)
+                    percent = int((written / total) * 100) if total else 100
+                    keep_going, _ = dialog.Update(percent)
+                    if not keep_going:
+                        cancelled = True
+                        break
+                    wx.YieldIfNeeded()
+
+            if cancelled:
+                try:
+                    os.remove(path)
+                except:
+                    pass
+                speaker.speak("Download cancelled")
+            else:
+                speaker.speak("Download complete")
+        except Exception as e:
+            logger.error(f"Failed to save attachment: {e}")
+            speaker.speak("Failed to save attachment")
+        finally:
+            if dialog:
+                try:
+                    dialog.Destroy()
+                except:
+                    pass
+        self._update_download_label()
+
+    def _stop_download_progress(self):
+        if self._download_progress:
             try:
-                progress = AudibleProgress("Downloading attachment, please wait", interval=6)
-                progress.start()
-                total = len(data)
-                chunk_size = 64 * 1024
-                dialog = wx.ProgressDialog(
-                    "Downloading Attachment",
-                    "Downloading, please wait...",
-                    maximum=100,
-                    style=wx.PD_APP_MODAL | wx.PD_CAN_ABORT | wx.PD_ELAPSED_TIME
-                )
-                cancelled = False
-                written = 0
-                with open(path, "wb") as f:
-                    for i in range(0, total, chunk_size):
-                        chunk = data[i:i + chunk_size]
-                        f.write(chunk)
-                        written += len(chunk)
-                        percent = int((written / total) * 100) if total else 100
-                        keep_going, _ = dialog.Update(percent)
-                        if not keep_going:
-                            cancelled = True
-                            break
-                        wx.YieldIfNeeded()
-
-                if cancelled:
-                    try:
-                        os.remove(path)
-                    except:
-                        pass
-                    speaker.speak("Download cancelled")
-                else:
-                    speaker.speak("Download complete")
-            except Exception as e:
-                logger.error(f"Failed to save attachment: {e}")
-                speaker.speak("Failed to save attachment")
-            finally:
-                if dialog:
-                    try:
-                        dialog.Destroy()
-                    except:
-                        pass
-                if progress:
-                    progress.stop()
-            self._update_download_label()
+                self._download_progress.stop()
+            except Exception:
+                pass
+            self._download_progress = None
 
     def _update_download_label(self):
         if not self.current_attachments:
@@ -557,8 +631,10 @@ class MessageViewerPanel(wx.Panel):
             self.download_btn.SetLabel("Download Attachment")
             return
         att = self.current_attachments[idx]
-        data = att.get("data") or b""
-        size_str = self._format_bytes(len(data))
+        size = att.get("size")
+        if size is None:
+            size = len(att.get("data") or b"")
+        size_str = self._format_bytes(size)
         self.download_btn.SetLabel(f"Download ({size_str})")
 
     def _format_bytes(self, size: int) -> str: